@@ -0,0 +1,103 @@
+import argparse
+import random
+import time
+import numpy as np
+from typing import List
+from src.batching import EncodingScheduler
+from src.encoders import PARITY_SENTENCES, TorchEncoder
+from src.models import Batching
+
+
+def parse_args():
+    """
+    Prepares the argument parser and parses the provided arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compares the encoding scheduler with a plain encode call."
+    )
+    parser.add_argument(
+        "--sentences",
+        type=str,
+        help="a file containing one sentence per line. Defaults to synthetic sentences",
+    )
+    parser.add_argument(
+        "--count", type=int, default=5000, help="the number of synthetic sentences"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="the fixed batch size of the scheduler. Defaults to adaptive",
+    )
+    parser.add_argument(
+        "--memory-cap-mb",
+        type=float,
+        default=Batching().memory_cap_mb,
+        help="the memory cap of the scheduler",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=3, help="the number of timed runs of each method"
+    )
+    return parser.parse_args()
+
+
+def synthetic_sentences(count: int) -> List[str]:
+    """
+    Builds sentences of mixed lengths out of the words of the parity sentences.
+    """
+    rng = random.Random(0)
+    words = " ".join(PARITY_SENTENCES).split()
+    return [
+        " ".join(rng.choices(words, k=rng.choice([2, 3, 4, 6, 10, 20, 40])))
+        for _ in range(count)
+    ]
+
+
+def timed(fn, runs: int):
+    """
+    Returns the result of the given function and its best duration over the given runs.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    args = parse_args()
+    if args.sentences:
+        with open(args.sentences, "r") as sentences_file:
+            sentences = [line.strip() for line in sentences_file if line.strip()]
+    else:
+        sentences = synthetic_sentences(args.count)
+
+    encoder = TorchEncoder()
+    scheduler = EncodingScheduler(
+        encoder, Batching(args.batch_size, args.memory_cap_mb)
+    )
+
+    # The call used before the scheduler was introduced
+    expected, baseline = timed(lambda: encoder.model.encode(sentences), args.runs)
+    # One untimed run, to let the adaptive batch size converge
+    scheduler.encode(sentences)
+    actual, scheduled = timed(lambda: scheduler.encode(sentences), args.runs)
+
+    similarities = (expected * actual).sum(axis=1) / (
+        np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1)
+    )
+    print(f"Sentences:               {len(sentences)}")
+    print(
+        f"model.encode:            {baseline:.3f}s ({len(sentences) / baseline:.1f}/s)"
+    )
+    print(
+        f"EncodingScheduler:       {scheduled:.3f}s ({len(sentences) / scheduled:.1f}/s)"
+    )
+    print(f"Speedup:                 {baseline / scheduled:.2f}x")
+    print(f"Converged batch size:    {scheduler.batch_size}")
+    print(f"Min cosine similarity:   {similarities.min():.6f}")
+
+
+if __name__ == "__main__":
+    main()
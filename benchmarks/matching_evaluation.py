@@ -0,0 +1,234 @@
+import argparse
+import json
+import time
+import numpy as np
+from typing import Any, Dict, List, Set, Tuple
+from src.match import MATCH_THRESHOLD, Matcher
+from src.models import Batching, Encoder, EncoderBackend, Item, Language
+
+# The matching modes which can be evaluated
+MODES = ["torch", "torch-no-lemmatization", "onnx", "onnx-quantized"]
+
+# The cut-offs at which the precision and the recall are computed
+KS = [1, 5, 10]
+
+
+def parse_args():
+    """
+    Prepares the argument parser and parses the provided arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Evaluates the accuracy and the latency of the matcher on a labeled set."
+    )
+    parser.add_argument(
+        "dataset",
+        type=str,
+        help="a JSON file with the inventory, the queries and their relevant items",
+    )
+    parser.add_argument(
+        "--modes",
+        type=str,
+        default="torch,torch-no-lemmatization",
+        help=f"the comma-separated modes to evaluate, among {', '.join(MODES)}",
+    )
+    parser.add_argument(
+        "--onnx-path",
+        type=str,
+        help="the directory of the exported ONNX model, for the onnx modes",
+    )
+    parser.add_argument(
+        "--thresholds",
+        type=str,
+        default=f"0.5,{MATCH_THRESHOLD},0.7",
+        help="the comma-separated similarity thresholds at which the matches are evaluated",
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        default="matching_evaluation_report.json",
+        help="the file the report is written to",
+    )
+    return parser.parse_args()
+
+
+def build_mode(mode: str, onnx_path: str) -> Tuple[Encoder, bool]:
+    """
+    Returns the encoder settings and whether to lemmatize for the given mode.
+    """
+    if mode == "torch":
+        return Encoder(), True
+    elif mode == "torch-no-lemmatization":
+        return Encoder(), False
+    elif mode in ("onnx", "onnx-quantized"):
+        if not onnx_path:
+            raise ValueError(f"The '{mode}' mode requires --onnx-path")
+        return (
+            Encoder(
+                EncoderBackend.ONNX,
+                onnx_path,
+                quantized=mode == "onnx-quantized",
+                parity_check=False,
+            ),
+            True,
+        )
+    raise ValueError(f"Unknown mode: {mode}")
+
+
+def precision_recall_at_k(
+    ranked: List[str], relevant: Set[str], k: int
+) -> Tuple[float, float]:
+    """
+    Returns the precision and the recall of the first k ranked items.
+    """
+    hits = len(set(ranked[:k]) & relevant)
+    return hits / k, hits / len(relevant) if relevant else 0.0
+
+
+def distribution(values: List[float]) -> Dict[str, float]:
+    """
+    Summarizes the given values with their mean and percentiles.
+    """
+    if not values:
+        return {}
+    p0, p5, p50, p95, p100 = np.percentile(values, [0, 5, 50, 95, 100])
+    return {
+        "min": float(p0),
+        "p5": float(p5),
+        "p50": float(p50),
+        "p95": float(p95),
+        "max": float(p100),
+        "mean": float(np.mean(values)),
+    }
+
+
+def evaluate(
+    matcher: Matcher,
+    inventory: List[Item],
+    queries: List[Tuple[Item, Set[str]]],
+    thresholds: List[float],
+) -> Dict[str, Any]:
+    """
+    Matches each query against the inventory, returning the accuracy and latency metrics.
+    """
+    start = time.perf_counter()
+    candidates = matcher.encode_candidates(inventory)
+    encoding_duration = time.perf_counter() - start
+
+    precisions: Dict[int, List[float]] = {k: [] for k in KS}
+    recalls: Dict[int, List[float]] = {k: [] for k in KS}
+    # For each threshold, the number of relevant items returned and of items returned
+    returned = {t: [0, 0] for t in thresholds}
+    relevant_similarities: List[float] = []
+    irrelevant_similarities: List[float] = []
+    latencies: List[float] = []
+
+    for query, relevant in queries:
+        # What find_matches does, keeping the similarities
+        start = time.perf_counter()
+        similarities = matcher.similarities(query, candidates)
+        order = sorted(range(len(similarities)), key=lambda g: -similarities[g])
+        latencies.append(time.perf_counter() - start)
+
+        ranked = [
+            (candidates.items[i].id, similarities[g])
+            for g in order
+            for i in candidates.groups[g]
+        ]
+        ranked_ids = [id for id, _ in ranked]
+        for k in KS:
+            precision, recall = precision_recall_at_k(ranked_ids, relevant, k)
+            precisions[k].append(precision)
+            recalls[k].append(recall)
+
+        for threshold in thresholds:
+            matches = [id for id, similarity in ranked if similarity >= threshold]
+            returned[threshold][0] += len(set(matches) & relevant)
+            returned[threshold][1] += len(matches)
+
+        for id, similarity in ranked:
+            if id in relevant:
+                relevant_similarities.append(similarity)
+            else:
+                irrelevant_similarities.append(similarity)
+
+    total_relevant = sum(len(relevant) for _, relevant in queries)
+    return {
+        "encoding_seconds": encoding_duration,
+        "precision_at_k": {k: float(np.mean(precisions[k])) for k in KS},
+        "recall_at_k": {k: float(np.mean(recalls[k])) for k in KS},
+        "thresholds": {
+            threshold: {
+                "precision": hits / count if count else 0.0,
+                "recall": hits / total_relevant if total_relevant else 0.0,
+                "matches_per_query": count / len(queries),
+            }
+            for threshold, (hits, count) in returned.items()
+        },
+        "similarities": {
+            "relevant": distribution(relevant_similarities),
+            "irrelevant": distribution(irrelevant_similarities),
+        },
+        "latency_ms": distribution([latency * 1000 for latency in latencies]),
+        "throughput": len(latencies) / sum(latencies) if latencies else 0.0,
+    }
+
+
+def print_results(mode: str, results: Dict[str, Any]):
+    """
+    Prints the results of one mode.
+    """
+    latency = results["latency_ms"]
+    print(f"\n=== {mode} ===")
+    print(f"Inventory encoding:  {results['encoding_seconds']:.3f}s")
+    for k in KS:
+        print(
+            f"P@{k:<2} / R@{k:<2}:         {results['precision_at_k'][k]:.3f} / {results['recall_at_k'][k]:.3f}"
+        )
+    for threshold, values in results["thresholds"].items():
+        print(
+            f"Threshold {threshold:<4}:      precision {values['precision']:.3f}, recall {values['recall']:.3f}, {values['matches_per_query']:.1f} matches/query"
+        )
+    for kind, values in results["similarities"].items():
+        if values:
+            print(
+                f"{kind.capitalize() + ' similarity:':<21}p5 {values['p5']:.3f}, p50 {values['p50']:.3f}, p95 {values['p95']:.3f}"
+            )
+    print(
+        f"Latency:             p50 {latency['p50']:.2f}ms, p95 {latency['p95']:.2f}ms, max {latency['max']:.2f}ms"
+    )
+    print(f"Throughput:          {results['throughput']:.1f} queries/s")
+
+
+def main():
+    args = parse_args()
+    with open(args.dataset, "r") as dataset_file:
+        dataset = json.load(dataset_file)
+
+    language = Language(dataset.get("language", Language.EN.value))
+    inventory = [
+        Item(i["type"], i["manufacturer"], i["model"], id=i["id"])
+        for i in dataset["inventory"]
+    ]
+    queries = [
+        (
+            Item(q["query"]["type"], q["query"]["manufacturer"], q["query"]["model"]),
+            set(q["relevant"]),
+        )
+        for q in dataset["queries"]
+    ]
+    thresholds = [float(t) for t in args.thresholds.split(",")]
+
+    report = {}
+    for mode in args.modes.split(","):
+        encoder, lemmatize = build_mode(mode, args.onnx_path)
+        matcher = Matcher(language, encoder, Batching(), lemmatize)
+        report[mode] = evaluate(matcher, inventory, queries, thresholds)
+        print_results(mode, report[mode])
+
+    with open(args.report, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+    print(f"\nReport written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import websockets
+from typing import Dict, List, Optional, Tuple
+from src.models import WireFormat
+from src.serialization import build_codecs, select_codec
+
+DEFAULT_QUERIES = [
+    {
+        "query": {"type": "Lit médicalisé", "manufacturer": "Bosch", "model": "Med231"},
+        "weight": 1,
+    }
+]
+
+
+def parse_args():
+    """
+    Prepares the argument parser and parses the provided arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Load generator acting as the WebSockets server for a running connector."
+    )
+    parser.add_argument(
+        "--host", type=str, default="localhost", help="the host to bind"
+    )
+    parser.add_argument("--port", type=int, default=8765, help="the port to bind")
+    parser.add_argument(
+        "--queries",
+        type=str,
+        help="a JSON file containing a list of {'query': {type, manufacturer, model}, 'weight': n} "
+        "objects to replay. Defaults to a single query",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--rate",
+        type=float,
+        help="the target rate of requests per second (open loop, regardless of replies)",
+    )
+    mode.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="the number of requests kept in flight (closed loop). Defaults to 1",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=30, help="the test duration, in seconds"
+    )
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=0,
+        help="the number of seconds at the beginning of the test whose results are discarded",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30,
+        help="the number of seconds after which a request is counted as timed out",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="the random seed")
+    parser.add_argument(
+        "--formats",
+        type=str,
+        default="",
+        help=f"the comma-separated message formats accepted, by order of preference, among "
+        f"{', '.join(WireFormat.values())}. Defaults to plain JSON",
+    )
+    parser.add_argument(
+        "--no-compression",
+        action="store_true",
+        help="refuse permessage-deflate compression",
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        default="load_test_report.json",
+        help="the file to write the JSON report to",
+    )
+    return parser.parse_args()
+
+
+def load_queries(filename: Optional[str]) -> Tuple[List[dict], List[float]]:
+    """
+    Loads the queries mix, returning the queries and their weights.
+    """
+    entries = DEFAULT_QUERIES
+    if filename:
+        with open(filename, "r") as queries_file:
+            entries = json.load(queries_file)
+
+    return [e["query"] for e in entries], [e.get("weight", 1) for e in entries]
+
+
+def parse_formats(formats: str) -> List[WireFormat]:
+    """
+    Parses a comma-separated list of formats.
+    """
+    return [WireFormat(f) for f in formats.split(",") if f]
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """
+    Returns the p-th percentile (nearest-rank) of the given values.
+    """
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class LoadGenerator:
+    """
+    Sends requests to a connected connector and records the latency of its replies.
+    """
+
+    def __init__(self, websocket, queries: List[dict], weights: List[float], args):
+        self._websocket = websocket
+        self._queries = queries
+        self._weights = weights
+        self._args = args
+        self._codec = select_codec(
+            build_codecs(parse_formats(args.formats)), websocket.subprotocol
+        )
+        self._random = random.Random(args.seed)
+        self._next_id = 0
+        self._pending: Dict[str, Tuple[float, asyncio.Future]] = {}
+        # Time at which the first chunk of each streamed response was received
+        self._first_chunks: Dict[str, float] = {}
+        self.latencies: List[float] = []
+        self.first_result_latencies: List[float] = []
+        self.found = 0
+        self.overloaded = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.bytes_received = 0
+        self.messages_received = 0
+
+    async def run(self) -> float:
+        """
+        Runs the test, returning its measured duration (excluding the warmup).
+        """
+        receiver = asyncio.ensure_future(self._receive())
+        start = time.perf_counter()
+        self._measure_from = start + self._args.warmup
+        self._deadline = start + self._args.warmup + self._args.duration
+        try:
+            if self._args.rate:
+                await self._open_loop()
+            else:
+                await asyncio.gather(
+                    *[self._closed_loop() for _ in range(self._args.concurrency)]
+                )
+        finally:
+            receiver.cancel()
+        return min(time.perf_counter(), self._deadline) - self._measure_from
+
+    async def _open_loop(self):
+        interval = 1 / self._args.rate
+        next_send = time.perf_counter()
+        in_flight = []
+        while next_send < self._deadline:
+            in_flight.append(asyncio.ensure_future(self._request()))
+            next_send += interval
+            await asyncio.sleep(max(0, next_send - time.perf_counter()))
+        await asyncio.gather(*in_flight)
+
+    async def _closed_loop(self):
+        while time.perf_counter() < self._deadline:
+            await self._request()
+
+    async def _request(self):
+        query = self._random.choices(self._queries, self._weights)[0]
+        request_id = str(self._next_id)
+        self._next_id += 1
+
+        future = asyncio.get_running_loop().create_future()
+        sent_at = time.perf_counter()
+        self._pending[request_id] = (sent_at, future)
+        try:
+            await self._websocket.send(
+                self._codec.encode({**query, "requestId": request_id})
+            )
+            response = await asyncio.wait_for(future, self._args.timeout)
+        except asyncio.TimeoutError:
+            self._pending.pop(request_id, None)
+            self._first_chunks.pop(request_id, None)
+            if sent_at >= self._measure_from:
+                self.timeouts += 1
+            return
+        except websockets.ConnectionClosed:
+            self._pending.pop(request_id, None)
+            self.errors += 1
+            return
+
+        if sent_at >= self._measure_from:
+            if response.get("error") == "overloaded":
+                self.overloaded += 1
+                return
+
+            received_at = time.perf_counter()
+            self.latencies.append(received_at - sent_at)
+            self.first_result_latencies.append(
+                self._first_chunks.pop(request_id, received_at) - sent_at
+            )
+            if response.get("found"):
+                self.found += 1
+
+    async def _receive(self):
+        async for message in self._websocket:
+            self.bytes_received += len(message)
+            self.messages_received += 1
+            response = self._codec.decode(message)
+            request_id = response.get("requestId")
+            if request_id is None and self._pending:
+                # Connector not echoing ids: replies come back in order
+                request_id = next(iter(self._pending))
+
+            if response.get("end") is False:
+                # Streamed response, which is complete on the chunk marked as the end
+                self._first_chunks.setdefault(request_id, time.perf_counter())
+                continue
+
+            pending = self._pending.pop(request_id, None)
+            if pending and not pending[1].done():
+                pending[1].set_result(response)
+
+    def report(self, duration: float) -> dict:
+        """
+        Builds the report of the test.
+        """
+        latencies_ms = [latency * 1000 for latency in self.latencies]
+        first_result_latencies_ms = [
+            latency * 1000 for latency in self.first_result_latencies
+        ]
+        return {
+            "mode": (
+                f"rate={self._args.rate}/s"
+                if self._args.rate
+                else f"concurrency={self._args.concurrency}"
+            ),
+            "duration_seconds": duration,
+            "completed": len(self.latencies),
+            "found": self.found,
+            "overloaded": self.overloaded,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "format": self._codec.format.value,
+            "compression": self._websocket.extensions != [],
+            "mean_message_bytes": (
+                self.bytes_received / self.messages_received
+                if self.messages_received
+                else None
+            ),
+            "throughput_per_second": (
+                len(self.latencies) / duration if duration > 0 else 0
+            ),
+            "latency_ms": {
+                "mean": sum(latencies_ms) / len(latencies_ms) if latencies_ms else None,
+                "p50": percentile(latencies_ms, 50),
+                "p95": percentile(latencies_ms, 95),
+                "p99": percentile(latencies_ms, 99),
+                "max": max(latencies_ms) if latencies_ms else None,
+            },
+            "first_result_latency_ms": {
+                "p50": percentile(first_result_latencies_ms, 50),
+                "p95": percentile(first_result_latencies_ms, 95),
+                "p99": percentile(first_result_latencies_ms, 99),
+            },
+        }
+
+
+async def main():
+    args = parse_args()
+    queries, weights = load_queries(args.queries)
+    done = asyncio.get_running_loop().create_future()
+
+    async def handler(websocket, path):
+        if done.done():
+            return
+
+        print("Connector connected, starting the load test...")
+        generator = LoadGenerator(websocket, queries, weights, args)
+        report = generator.report(await generator.run())
+        if not done.done():
+            done.set_result(report)
+
+    codecs = build_codecs(parse_formats(args.formats))
+    async with websockets.serve(
+        handler,
+        args.host,
+        args.port,
+        subprotocols=[codec.subprotocol for codec in codecs],
+        compression=None if args.no_compression else "deflate",
+    ):
+        print(f"Waiting for a connector on ws://{args.host}:{args.port}...")
+        report = await done
+
+    print(json.dumps(report, indent=2))
+    with open(args.report, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+    print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
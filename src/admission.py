@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any, Callable, Coroutine
+from src.communication import Request, Response
+from src.metrics import metrics
+from src.models import Admission
+
+
+class AdmissionController:
+    """
+    Queues the incoming requests in a bounded queue, from which a fixed number of workers handle
+    them. Requests arriving while the queue is full are immediately answered with an "overloaded"
+    response, and requests whose deadline has passed while they were waiting are dropped.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Request], Coroutine[Any, Any, Any]],
+        admission: Admission,
+    ):
+        self._handler = handler
+        self._admission = admission
+        self._queue: asyncio.Queue = asyncio.Queue(admission.queue_size)
+        metrics.gauge("queue_depth", self._queue.qsize)
+
+    async def submit(self, request: Request):
+        """
+        Queues the given request, or sheds it if the queue is full.
+        """
+        if self._admission.deadline:
+            request.deadline = request.received_at + self._admission.deadline
+
+        try:
+            self._queue.put_nowait(request)
+        except asyncio.QueueFull:
+            metrics.increment("requests_shed")
+            print(f"Too many requests queued, shedding request {request}")
+            await request.reply(Response.overloaded())
+
+    async def run(self):
+        """
+        Handles the queued requests forever.
+        """
+        await asyncio.gather(*[self._work() for _ in range(self._admission.workers)])
+
+    async def _work(self):
+        while True:
+            request = await self._queue.get()
+            try:
+                if request.expired():
+                    metrics.increment("deadline_misses")
+                    print(
+                        f"Deadline of request {request} passed while queued, dropping"
+                    )
+                    continue
+
+                await self._handler(request)
+            except Exception as e:
+                print(f"Failed to handle request {request}: {e!r}")
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,137 @@
+import time
+import numpy as np
+from typing import Dict, List
+from src.encoders import SentenceEncoder
+from src.metrics import metrics
+from src.models import Batching
+
+MIN_BATCH_SIZE = 8
+MAX_BATCH_SIZE = 512
+INITIAL_BATCH_SIZE = 32
+
+# Size of the model (DistilBERT) activations, used for estimating the memory used by a batch
+HIDDEN_SIZE = 768
+INTERMEDIATE_SIZE = 3072
+ATTENTION_HEADS = 12
+FLOAT_SIZE = 4
+
+# Weight of the latest measure in the throughput moving average
+THROUGHPUT_SMOOTHING = 0.3
+
+
+class EncodingScheduler:
+    """
+    Encodes lists of sentences in batches of sentences of similar token length, so that little
+    padding is computed, restoring the original order afterwards. Unless it is fixed in the
+    settings, the batch size is chosen adaptively, converging to the one with the best measured
+    throughput, while keeping the estimated memory of each batch under the configured cap.
+
+    Since the sentences are sorted by length, the batch sizes tried last would be measured on
+    the longest sentences: the throughputs are kept per sentence length bucket (powers of two),
+    so that batch sizes are only compared on sentences of similar length.
+    """
+
+    def __init__(self, encoder: SentenceEncoder, batching: Batching):
+        self._encoder = encoder
+        self._fixed_batch_size = batching.batch_size
+        self._memory_cap = batching.memory_cap_mb * 2**20
+        # Moving average of the measured throughput (tokens per second) for each length bucket
+        # and batch size
+        self._throughputs: Dict[int, Dict[int, float]] = {}
+        # The length bucket of the latest batch
+        self._bucket = 0
+        metrics.gauge("encoding_batch_size", lambda: self.batch_size)
+
+    @property
+    def batch_size(self) -> int:
+        """
+        The batch size currently used for encoding.
+        """
+        return self._choose_batch_size(self._bucket)
+
+    def encode(self, sentences: List[str]) -> np.ndarray:
+        """
+        Encodes the given sentences, returning a matrix with one embedding per row, in the same
+        order as the sentences.
+        """
+        lengths = self._encoder.count_tokens(sentences)
+        order = sorted(range(len(sentences)), key=lambda i: lengths[i])
+
+        embeddings = None
+        position = 0
+        while position < len(order):
+            # The first sentence of the batch is the shortest one
+            self._bucket = max(lengths[order[position]], 1).bit_length()
+            target_size = self._choose_batch_size(self._bucket)
+            batch_size = self._cap_batch_size(target_size, lengths, order, position)
+            indexes = order[position : position + batch_size]
+
+            start = time.perf_counter()
+            batch_embeddings = self._encoder.encode([sentences[i] for i in indexes])
+            elapsed = time.perf_counter() - start
+
+            if embeddings is None:
+                embeddings = np.empty(
+                    (len(sentences), batch_embeddings.shape[1]),
+                    dtype=batch_embeddings.dtype,
+                )
+            embeddings[indexes] = batch_embeddings
+
+            # Only full, uncapped batches are representative of the throughput of a batch size
+            if batch_size == target_size and len(indexes) == batch_size:
+                self._record(
+                    self._bucket,
+                    batch_size,
+                    sum(lengths[i] for i in indexes),
+                    elapsed,
+                )
+            position += len(indexes)
+
+        return embeddings if embeddings is not None else np.empty((0, 0))
+
+    def _choose_batch_size(self, bucket: int) -> int:
+        if self._fixed_batch_size:
+            return self._fixed_batch_size
+
+        throughputs = self._throughputs.get(bucket)
+        if not throughputs:
+            return INITIAL_BATCH_SIZE
+
+        # Explore the neighbours of the best batch size, then stick to the best one
+        best = max(throughputs, key=lambda size: throughputs[size])
+        if best * 2 <= MAX_BATCH_SIZE and best * 2 not in throughputs:
+            return best * 2
+
+        if best // 2 >= MIN_BATCH_SIZE and best // 2 not in throughputs:
+            return best // 2
+
+        return best
+
+    def _cap_batch_size(
+        self, batch_size: int, lengths: List[int], order: List[int], position: int
+    ) -> int:
+        # Sentences are sorted by length, so the last one of the batch is the longest
+        while batch_size > 1:
+            last = min(position + batch_size, len(order)) - 1
+            if (
+                self._estimate_memory(batch_size, lengths[order[last]])
+                <= self._memory_cap
+            ):
+                break
+            batch_size //= 2
+        return batch_size
+
+    def _estimate_memory(self, batch_size: int, length: int) -> int:
+        activations = batch_size * length * (4 * HIDDEN_SIZE + INTERMEDIATE_SIZE)
+        attention = batch_size * ATTENTION_HEADS * length**2
+        return (activations + attention) * FLOAT_SIZE
+
+    def _record(self, bucket: int, batch_size: int, tokens: int, seconds: float):
+        throughput = tokens / max(seconds, 1e-9)
+        throughputs = self._throughputs.setdefault(bucket, {})
+        previous = throughputs.get(batch_size)
+        throughputs[batch_size] = (
+            throughput
+            if previous is None
+            else previous + THROUGHPUT_SMOOTHING * (throughput - previous)
+        )
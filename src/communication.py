@@ -1,8 +1,11 @@
+import asyncio
+import time
 import websockets
-import json
 
-from typing import Any, Callable, Coroutine, List
-from src.models import Item
+from typing import Any, Callable, Coroutine, Dict, List, Optional
+from websockets.extensions.permessage_deflate import ClientPerMessageDeflateFactory
+from src.models import Communication, Item
+from src.serialization import Codec, JsonCodec, build_codecs, select_codec
 
 
 class Response:
@@ -10,18 +13,30 @@ class Response:
     A response to a query to send back to the server.
     """
 
-    def __init__(self, found: bool, items: List[Item]):
+    def __init__(self, found: bool, items: List[Item], error: Optional[str] = None):
         self.found = found
         self.items = items
+        self.error = error
+
+    @staticmethod
+    def overloaded():
+        """
+        Builds the response sent when the connector is too busy to handle a request.
+        """
+        return Response(False, [], "overloaded")
 
     def serialize(self) -> dict:
         """
         Serializes the response to a dictionary.
         """
-        return {
+        d = {
             "found": self.found,
             "items": list(map(lambda item: item.serialize(), self.items)),
         }
+        if self.error:
+            d["error"] = self.error
+
+        return d
 
     def __repr__(self) -> str:
         return str(self.serialize())
@@ -32,17 +47,49 @@ class Request:
     A request sent by the server.
     """
 
-    def __init__(self, connection, item: Item):
+    def __init__(
+        self,
+        connection,
+        item: Item,
+        id: Optional[str] = None,
+        codec: Optional[Codec] = None,
+        chunk_size: Optional[int] = None,
+    ):
         self._connection = connection
+        self._codec = codec if codec else JsonCodec()
+        # The maximum number of items per reply, if the response is streamed
+        self.chunk_size = chunk_size
+        self._next_seq = 0
         self.item = item
+        self.id = id
+        self.received_at = time.monotonic()
+        # Monotonic time after which the server is not waiting for the response anymore, if any
+        self.deadline: Optional[float] = None
+        # Duration, in seconds, of each of the stages of the handling of the request
+        self.timings: Dict[str, float] = {}
+
+    def expired(self) -> bool:
+        """
+        Returns whether the deadline of the request has passed.
+        """
+        return self.deadline is not None and time.monotonic() > self.deadline
 
-    async def reply(self, response: Response):
+    async def reply(self, response: Response, end: bool = True):
         """
-        Answers the request with the given response.
+        Answers the request with the given response. If the request carried an id, it is echoed
+        back so that the server can correlate the response. If the response is streamed, it is
+        numbered and `end` tells whether it is the last one.
         """
-        await self._connection.send(
-            json.dumps(response.serialize(), ensure_ascii=False).encode()
-        )
+        serialized = response.serialize()
+        if self.id is not None:
+            serialized["requestId"] = self.id
+
+        if self.chunk_size is not None:
+            serialized["seq"] = self._next_seq
+            serialized["end"] = end
+            self._next_seq += 1
+
+        await self._connection.send(self._codec.encode(serialized))
 
     def __repr__(self) -> str:
         return str(self.item)
@@ -53,30 +100,64 @@ class Client:
     A client built on top of WebSockets to communicate with the server.
     """
 
-    def __init__(self, server_uri: str):
+    def __init__(self, server_uri: str, communication: Optional[Communication] = None):
         self._uri = server_uri
+        self._communication = communication if communication else Communication()
+        self._codecs = build_codecs(self._communication.formats)
+
+    def _connect_options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {}
+        if self._codecs:
+            options["subprotocols"] = [codec.subprotocol for codec in self._codecs]
+
+        if not self._communication.compression:
+            options["compression"] = None
+        elif self._communication.compression_level is not None:
+            options["compression"] = None
+            options["extensions"] = [
+                ClientPerMessageDeflateFactory(
+                    compress_settings={"level": self._communication.compression_level}
+                )
+            ]
+        return options
 
     async def connect(self):
         """
         Connects to the server.
         """
         ssl = True if self._uri.startswith("wss") else False
+        options = self._connect_options()
         async for websocket in websockets.connect(
-            self._uri, ssl=ssl
-        ) if ssl else websockets.connect(self._uri):
+            self._uri, ssl=ssl, **options
+        ) if ssl else websockets.connect(self._uri, **options):
             # Try-except-continue used for automatic reconnection with exponential backoff
             try:
                 self._connection = websocket
+                codec = select_codec(self._codecs, websocket.subprotocol)
+                print(f"Connected, exchanging messages as {codec.format.value}")
                 async for message in self._connection:
-                    json_obj = json.loads(message.decode())
+                    json_obj = codec.decode(message)
                     item = Item(
                         json_obj["type"], json_obj["manufacturer"], json_obj["model"]
                     )
-                    request = Request(self._connection, item)
-                    await self.on_message_handler(request)
+                    request = Request(
+                        self._connection,
+                        item,
+                        json_obj.get("requestId"),
+                        codec,
+                        self._communication.chunk_size,
+                    )
+                    # Handled concurrently, so that slow requests do not hold up the others
+                    asyncio.ensure_future(self._handle(request))
             except websockets.ConnectionClosed:
                 continue
 
+    async def _handle(self, request: Request):
+        try:
+            await self.on_message_handler(request)
+        except Exception as e:
+            print(f"Failed to handle request {request}: {e!r}")
+
     async def close(self):
         """
         Closes the connection to the server.
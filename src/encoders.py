@@ -0,0 +1,370 @@
+import argparse
+import os
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import List, Optional, Union
+from src.models import Encoder, EncoderBackend
+
+MODEL_NAME = "distiluse-base-multilingual-cased-v1"
+
+ONNX_MODEL_FILENAME = "model.onnx"
+ONNX_QUANTIZED_MODEL_FILENAME = "model.quant.onnx"
+DENSE_FILENAME = "dense.npz"
+# The PyTorch embeddings of the parity sentences, saved on export
+REFERENCE_FILENAME = "reference.npz"
+
+# Sentences used for checking that an alternative backend produces the same embeddings as PyTorch
+PARITY_SENTENCES = [
+    "Lit médicalisé Bosch Med231",
+    "Hospital bed Hill-Rom Progressa",
+    "Pousse-seringue B. Braun Perfusor Space",
+    "Infusion pump Baxter Sigma Spectrum",
+    "Moniteur patient Philips IntelliVue MX450",
+    "Defibrillator Zoll AED Plus",
+    "Fauteuil roulant Invacare Action 3",
+    "Ventilator Dräger Evita V500",
+    "Échographe GE Vivid S70",
+    "Oxygen concentrator Philips EverFlo",
+]
+
+
+class EncoderException(Exception):
+    """
+    An encoder exception.
+    """
+
+
+class SentenceEncoder(ABC):
+    """
+    Abstract class modeling a sentence encoder, turning sentences into embeddings.
+    """
+
+    @abstractmethod
+    def encode(self, sentences: Union[str, List[str]]) -> np.ndarray:
+        """
+        Encodes the given sentence (or list of sentences, as a single batch), returning its
+        embedding (or a matrix with one embedding per row).
+        """
+        pass
+
+    @abstractmethod
+    def count_tokens(self, sentences: List[str]) -> List[int]:
+        """
+        Returns the number of tokens of each of the given sentences, once truncated.
+        """
+        pass
+
+    def freeze(self):
+        """
+        Makes the weights read-only, so that they are never written to once loaded.
+        """
+        pass
+
+
+class TorchEncoder(SentenceEncoder):
+    """
+    Encoder running the SentenceTransformer model with PyTorch.
+    """
+
+    def __init__(self, threads: Optional[int] = None):
+        # Imported here, so that the other backends do not load PyTorch
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.model = SentenceTransformer(MODEL_NAME)
+
+    def encode(self, sentences: Union[str, List[str]]) -> np.ndarray:
+        if isinstance(sentences, str):
+            return self.model.encode(sentences)
+        return self.model.encode(sentences, batch_size=max(1, len(sentences)))
+
+    def count_tokens(self, sentences: List[str]) -> List[int]:
+        tokens = self.model.tokenizer(
+            sentences, truncation=True, max_length=self.model.max_seq_length
+        )
+        return list(map(len, tokens["input_ids"]))
+
+    def freeze(self):
+        self.model.eval()
+        for parameter in self.model.parameters():
+            parameter.requires_grad_(False)
+
+
+class OnnxEncoder(SentenceEncoder):
+    """
+    Encoder running an exported (and optionally quantized) ONNX model with ONNX Runtime. The
+    model has to be exported first with `python -m src.encoders export <path>`.
+    """
+
+    def __init__(
+        self, path: str, quantized: bool = True, threads: Optional[int] = None
+    ):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise EncoderException(
+                "The 'onnx' encoder backend requires the 'onnxruntime' module"
+            )
+        from transformers import AutoTokenizer
+
+        model_filename = os.path.join(
+            path, ONNX_QUANTIZED_MODEL_FILENAME if quantized else ONNX_MODEL_FILENAME
+        )
+        if not os.path.isfile(model_filename):
+            raise EncoderException(f"ONNX model {model_filename} does not exist")
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if threads:
+            options.intra_op_num_threads = threads
+
+        self._session = onnxruntime.InferenceSession(
+            model_filename, options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = [i.name for i in self._session.get_inputs()]
+        self._tokenizer = AutoTokenizer.from_pretrained(path)
+
+        dense = np.load(os.path.join(path, DENSE_FILENAME))
+        self._dense_weight = dense["weight"]
+        self._dense_bias = dense["bias"]
+        self._max_seq_length = int(dense["max_seq_length"])
+
+    def encode(self, sentences: Union[str, List[str]]) -> np.ndarray:
+        single = isinstance(sentences, str)
+        tokens = self._tokenizer(
+            [sentences] if single else sentences,
+            padding=True,
+            truncation=True,
+            max_length=self._max_seq_length,
+            return_tensors="np",
+        )
+        (token_embeddings,) = self._session.run(
+            None, {name: tokens[name].astype(np.int64) for name in self._input_names}
+        )
+
+        embeddings = pool_and_project(
+            token_embeddings,
+            tokens["attention_mask"],
+            self._dense_weight,
+            self._dense_bias,
+        )
+        return embeddings[0] if single else embeddings
+
+    def count_tokens(self, sentences: List[str]) -> List[int]:
+        tokens = self._tokenizer(
+            sentences, truncation=True, max_length=self._max_seq_length
+        )
+        return list(map(len, tokens["input_ids"]))
+
+
+def pool_and_project(
+    token_embeddings: np.ndarray,
+    attention_mask: np.ndarray,
+    weight: np.ndarray,
+    bias: np.ndarray,
+) -> np.ndarray:
+    """
+    Applies the mean pooling and the tanh dense layer of the SentenceTransformer model to the
+    token embeddings output by the transformer, returning one embedding per sentence.
+    """
+    mask = attention_mask[..., np.newaxis].astype(np.float32)
+    pooled = (token_embeddings * mask).sum(axis=1) / np.clip(
+        mask.sum(axis=1), 1e-9, None
+    )
+    return np.tanh(pooled @ weight.T + bias)
+
+
+def build_encoder(settings: Encoder) -> SentenceEncoder:
+    """
+    Builds the encoder described by the given settings, checking its parity with the PyTorch
+    embeddings saved on export if requested.
+    """
+    if settings.backend == EncoderBackend.TORCH:
+        return TorchEncoder(settings.threads)
+
+    encoder = OnnxEncoder(settings.path, settings.quantized, settings.threads)
+    if settings.parity_check:
+        print("Checking the parity of the ONNX encoder with the PyTorch embeddings...")
+        similarity = check_parity(
+            load_reference(settings.path),
+            encoder,
+            PARITY_SENTENCES,
+            settings.parity_threshold,
+        )
+        print(f"Parity check passed (minimum cosine similarity: {similarity:.4f})")
+    return encoder
+
+
+def load_reference(path: str) -> np.ndarray:
+    """
+    Loads the PyTorch embeddings of the parity sentences saved with the exported model.
+    """
+    filename = os.path.join(path, REFERENCE_FILENAME)
+    if not os.path.isfile(filename):
+        raise EncoderException(
+            f"Reference embeddings {filename} do not exist, export the model again"
+        )
+    return np.load(filename)["embeddings"]
+
+
+def check_parity(
+    expected: np.ndarray,
+    candidate: SentenceEncoder,
+    sentences: List[str],
+    threshold: float,
+) -> float:
+    """
+    Checks that the candidate encoder produces embeddings close to the expected ones, returning
+    the minimum cosine similarity between the two. Raises an exception if it is below the given
+    threshold.
+    """
+    actual = candidate.encode(sentences)
+    similarities = (expected * actual).sum(axis=1) / (
+        np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1)
+    )
+    similarity = float(similarities.min())
+    if similarity < threshold:
+        raise EncoderException(
+            f"Encoder parity check failed: minimum cosine similarity {similarity:.4f} below {threshold}"
+        )
+    return similarity
+
+
+def export_onnx(
+    path: str, quantize: bool = True, threshold: float = Encoder().parity_threshold
+):
+    """
+    Exports the SentenceTransformer model to ONNX in the given directory, together with its
+    tokenizer, its dense layer and the PyTorch embeddings of the parity sentences, optionally also
+    writing a dynamically int8-quantized copy. The parity of the exported models with PyTorch is
+    checked.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Dense, Pooling, Transformer
+
+    class TokenEmbeddings(torch.nn.Module):
+        """
+        Wraps the transformer so that the exported graph only outputs the token embeddings.
+        """
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+    model = SentenceTransformer(MODEL_NAME, device="cpu")
+    transformer, pooling, dense = list(model)
+    if (
+        not isinstance(transformer, Transformer)
+        or not isinstance(pooling, Pooling)
+        or not isinstance(dense, Dense)
+        or not pooling.pooling_mode_mean_tokens
+        or not isinstance(dense.activation_function, torch.nn.Tanh)
+    ):
+        raise EncoderException(f"Unsupported architecture for model {MODEL_NAME}")
+
+    os.makedirs(path, exist_ok=True)
+    model_filename = os.path.join(path, ONNX_MODEL_FILENAME)
+
+    print(f"Exporting {MODEL_NAME} to {model_filename}...")
+    tokens = transformer.tokenizer(
+        PARITY_SENTENCES[:2], padding=True, return_tensors="pt"
+    )
+    torch.onnx.export(
+        TokenEmbeddings(transformer.auto_model).eval(),
+        (tokens["input_ids"], tokens["attention_mask"]),
+        model_filename,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["token_embeddings"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "token_embeddings": {0: "batch", 1: "sequence"},
+        },
+        opset_version=13,
+    )
+    transformer.tokenizer.save_pretrained(path)
+    np.savez(
+        os.path.join(path, DENSE_FILENAME),
+        weight=dense.linear.weight.detach().numpy(),
+        bias=dense.linear.bias.detach().numpy(),
+        max_seq_length=transformer.max_seq_length,
+    )
+    expected = model.encode(PARITY_SENTENCES)
+    np.savez(os.path.join(path, REFERENCE_FILENAME), embeddings=expected)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantized_filename = os.path.join(path, ONNX_QUANTIZED_MODEL_FILENAME)
+        print(f"Quantizing the model to {quantized_filename}...")
+        quantize_dynamic(
+            model_filename, quantized_filename, weight_type=QuantType.QInt8
+        )
+
+    for quantized in [False, True] if quantize else [False]:
+        similarity = check_parity(
+            expected, OnnxEncoder(path, quantized), PARITY_SENTENCES, threshold
+        )
+        print(
+            f"Parity check of the {'quantized' if quantized else 'exported'} model passed "
+            f"(minimum cosine similarity: {similarity:.4f})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encoder backends management.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser(
+        "export", help="export the model to ONNX, for the 'onnx' encoder backend"
+    )
+    export_parser.add_argument("path", type=str, help="the output directory")
+    export_parser.add_argument(
+        "--no-quantize", action="store_true", help="do not write a quantized model"
+    )
+    export_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=Encoder().parity_threshold,
+        help="the minimum cosine similarity with PyTorch accepted",
+    )
+
+    parity_parser = subparsers.add_parser(
+        "parity", help="check the parity of an exported ONNX model with PyTorch"
+    )
+    parity_parser.add_argument("path", type=str, help="the exported model directory")
+    parity_parser.add_argument(
+        "--no-quantize", action="store_true", help="check the non-quantized model"
+    )
+    parity_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=Encoder().parity_threshold,
+        help="the minimum cosine similarity accepted",
+    )
+
+    args = parser.parse_args()
+    if args.command == "export":
+        export_onnx(args.path, not args.no_quantize, args.threshold)
+    else:
+        similarity = check_parity(
+            TorchEncoder().encode(PARITY_SENTENCES),
+            OnnxEncoder(args.path, not args.no_quantize),
+            PARITY_SENTENCES,
+            args.threshold,
+        )
+        print(f"Parity check passed (minimum cosine similarity: {similarity:.4f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
 import argparse
 import asyncio
-from typing import Any, Callable, Coroutine, List
+import signal
+import time
+from typing import Optional, cast
+from src.admission import AdmissionController
 from src.match import Matcher
-from src.query import ApiQuerier, DbQuerier
-from src.models import ConnectionType, Item
+from src.metrics import metrics
+from src.query import build_querier
 from src.communication import Client, Request, Response
 from src.parser import ConfigParser
+from src.profiling import RequestProfiler, profiled
+from src.refresh import InventoryRefresher, InventorySnapshot
+from src.singleflight import SingleFlight
+
+METRICS_REPORT_INTERVAL = 60
 
 
 def parse_args():
@@ -22,24 +30,52 @@ def parse_args():
 
 
 async def handle_request(
-    query_handler: Callable[[], Coroutine[Any, Any, List[Item]]],
+    refresher: InventoryRefresher,
     request: Request,
     matcher: Matcher,
+    matches_flight: SingleFlight,
 ):
     """
-    Handles the request, querying the DB, finding matches and answering back.
+    Handles the request, finding matches in the latest inventory snapshot and answering back.
+    Identical requests handled concurrently share the same matching.
     """
     print(f"Handling new request {request}...")
+    metrics.increment("requests")
 
     requested_item = request.item
-    items: List[Item] = await query_handler()
+    request.timings["queue"] = time.monotonic() - request.received_at
+    start = time.perf_counter()
+    snapshot = await refresher.snapshot()
+    request.timings["snapshot"] = time.perf_counter() - start
 
-    if not items:
+    if not snapshot.candidates:
         print("No items found!")
         await request.reply(Response(False, []))
         return
 
-    matches = matcher.find_matches(requested_item, items)
+    if request.expired():
+        metrics.increment("deadline_misses")
+        print(f"Deadline of request {request} passed, dropping")
+        return
+
+    key = (
+        id(snapshot),
+        requested_item.type,
+        requested_item.manufacturer,
+        requested_item.model,
+    )
+    if request.chunk_size is not None:
+        await stream_matches(request, matcher, matches_flight, key, snapshot)
+        return
+
+    start = time.perf_counter()
+    matches = await matches_flight.do(
+        key,
+        lambda: asyncio.get_running_loop().run_in_executor(
+            None, profiled(matcher.find_matches), requested_item, snapshot.candidates
+        ),
+    )
+    request.timings["matching"] = time.perf_counter() - start
 
     if not matches:
         print("No matches found!")
@@ -48,14 +84,73 @@ async def handle_request(
 
     response = Response(True, matches)
     print(f"Answering the request with response {response}...\n")
+    start = time.perf_counter()
     await request.reply(response)
+    request.timings["reply"] = time.perf_counter() - start
+
+
+async def stream_matches(
+    request: Request,
+    matcher: Matcher,
+    matches_flight: SingleFlight,
+    key: tuple,
+    snapshot: InventorySnapshot,
+):
+    """
+    Answers the request with its matches in chunks, the best ones first: they are sent as soon as
+    they are known, before the others are sorted.
+    """
+    chunk_size = cast(int, request.chunk_size)
+    start = time.perf_counter()
+    # Identical requests share the similarities and the sorting of the matches
+    ranked = await matches_flight.do(
+        ("ranked", *key),
+        lambda: asyncio.get_running_loop().run_in_executor(
+            None,
+            profiled(matcher.rank_matches),
+            request.item,
+            snapshot.candidates,
+            chunk_size,
+        ),
+    )
+    request.timings["matching"] = time.perf_counter() - start
 
+    if not ranked:
+        print("No matches found!")
+        await request.reply(Response(False, []))
+        return
+
+    print(f"Streaming the matches of request {request}...\n")
+    start = time.perf_counter()
+
+    async def send(items, last):
+        for i in range(0, len(items), chunk_size):
+            end = last and i + chunk_size >= len(items)
+            await request.reply(Response(True, items[i : i + chunk_size]), end=end)
+            if "first_chunk" not in request.timings:
+                request.timings["first_chunk"] = time.perf_counter() - start
+
+    await send(ranked.head(), not ranked.has_tail())
+    if ranked.has_tail():
+        await send(
+            await asyncio.get_running_loop().run_in_executor(
+                None, profiled(ranked.tail)
+            ),
+            True,
+        )
+    request.timings["reply"] = time.perf_counter() - start
 
-async def main():
+
+async def main(
+    server_uri: str, config_filename: str, matcher: Optional[Matcher] = None
+):
+    """
+    Runs the connector. A matcher whose models are already loaded can be given, otherwise one is
+    created.
+    """
     client = None
     querier = None
     try:
-        server_uri, config_filename = parse_args()
         print("Welcome to the inventory connector!")
 
         print(f"Validating and parsing the configuration file '{config_filename}'...")
@@ -63,16 +158,30 @@ async def main():
         config = parser.parse()
 
         print("Initializing the client...")
-        client = Client(server_uri)
-        matcher = Matcher(config.language)
+        client = Client(server_uri, config.communication)
+        if not matcher:
+            matcher = Matcher(config.language, config.encoder, config.batching)
 
-        querier = (
-            DbQuerier(config)
-            if config.type == ConnectionType.DB
-            else ApiQuerier(config)
-        )
+        querier = build_querier(config)
         await querier.connect()
-        client.on_message(lambda r: handle_request(querier.query, r, matcher))
+
+        refresher = InventoryRefresher(querier, matcher, config.refresh.interval)
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGHUP, refresher.request_refresh
+            )
+        except (AttributeError, NotImplementedError):
+            # Signals are not available on this platform, rely on the interval only
+            pass
+        asyncio.ensure_future(refresher.run())
+        asyncio.ensure_future(metrics.report(METRICS_REPORT_INTERVAL))
+        matches_flight = SingleFlight("requests")
+        handler = lambda r: handle_request(refresher, r, matcher, matches_flight)
+        if config.profiling.enabled:
+            handler = RequestProfiler(config.profiling).wrap(handler)
+        admission = AdmissionController(handler, config.admission)
+        asyncio.ensure_future(admission.run())
+        client.on_message(admission.submit)
 
         print("Connecting to the server...")
         await client.connect()
@@ -86,6 +195,7 @@ async def main():
 
 
 if __name__ == "__main__":
+    server_uri, config_filename = parse_args()
     loop = asyncio.get_event_loop()
-    loop.run_until_complete(main())
+    loop.run_until_complete(main(server_uri, config_filename))
     loop.close()
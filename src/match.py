@@ -1,8 +1,126 @@
+import numpy as np
 import spacy
-from sentence_transformers import SentenceTransformer
 from scipy.spatial.distance import cosine
-from typing import List, Union
-from src.models import Item, Language
+from typing import Dict, List, Optional, Union
+from src.batching import EncodingScheduler
+from src.encoders import build_encoder
+from src.models import Batching, Encoder, Item, Language
+
+# The minimum similarity between a query and a candidate for the candidate to be a match
+MATCH_THRESHOLD = 0.6
+
+
+class EncodedCandidates:
+    """
+    A list of candidate items together with their precomputed embeddings. Items sharing the same
+    sentence are grouped, so that each sentence is encoded and scored only once.
+    """
+
+    def __init__(self, items: List[Item], groups: List[List[int]], embeddings):
+        self.items = items
+        # The indexes of the items corresponding to each embedding
+        self.groups = groups
+        self.embeddings = embeddings
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class EncodedCandidatesBuilder:
+    """
+    Builds encoded candidates incrementally, encoding the items chunk by chunk as they are
+    retrieved. Only the sentences not seen in previous chunks are encoded.
+    """
+
+    def __init__(self, matcher: "Matcher"):
+        self._matcher = matcher
+        self._items: List[Item] = []
+        self._groups: Dict[str, List[int]] = {}
+        self._embeddings: List[np.ndarray] = []
+
+    def add(self, candidates: List[Item]):
+        """
+        Adds the given candidates, encoding their new sentences.
+        """
+        new_sentences = []
+        for candidate in candidates:
+            sentence = candidate.to_sentence()
+            if sentence not in self._groups:
+                self._groups[sentence] = []
+                new_sentences.append(sentence)
+            self._groups[sentence].append(len(self._items))
+            self._items.append(candidate)
+
+        print(f"Encoding {len(candidates)} candidates ({len(new_sentences)} new)...")
+        if new_sentences:
+            self._embeddings.append(self._matcher.encode_sentences(new_sentences))
+
+    def build(self) -> EncodedCandidates:
+        """
+        Returns the encoded candidates added so far.
+        """
+        embeddings = np.concatenate(self._embeddings) if self._embeddings else []
+        return EncodedCandidates(self._items, list(self._groups.values()), embeddings)
+
+
+class RankedMatches:
+    """
+    The matches of a query, ranked in two steps so that the best ones can be sent before the
+    others are sorted: the `first` best groups of candidates are selected and sorted right away,
+    and the remaining ones are only sorted when requested.
+    """
+
+    def __init__(
+        self,
+        candidates: EncodedCandidates,
+        similarities: List[float],
+        threshold: float,
+        first: int,
+    ):
+        self._candidates = candidates
+        self._similarities = np.asarray(similarities, dtype=float)
+        matching = np.flatnonzero(self._similarities >= threshold)
+        if len(matching) > first:
+            # Unordered partition of the matching groups around the first-best one
+            partition = np.argpartition(-self._similarities[matching], first - 1)
+            self._head = matching[partition[:first]]
+            self._rest = matching[partition[first:]]
+        else:
+            self._head = matching
+            self._rest = matching[:0]
+        self._tail: Optional[List[Item]] = None
+
+    def __bool__(self) -> bool:
+        return len(self._head) > 0
+
+    def head(self) -> List[Item]:
+        """
+        Returns the items of the best groups, sorted in order of similarity (descending order).
+        """
+        return self._items(self._head)
+
+    def has_tail(self) -> bool:
+        """
+        Returns whether there are matches besides the best groups.
+        """
+        return len(self._rest) > 0
+
+    def tail(self) -> List[Item]:
+        """
+        Returns the items of the remaining groups, sorted in order of similarity (descending
+        order).
+        """
+        if self._tail is None:
+            self._tail = self._items(self._rest)
+        return self._tail
+
+    def _items(self, groups) -> List[Item]:
+        # Ties are ordered as in find_matches
+        groups = np.sort(groups)
+        order = groups[np.argsort(-self._similarities[groups], kind="stable")]
+        return [
+            self._candidates.items[i] for g in order for i in self._candidates.groups[g]
+        ]
 
 
 class Matcher:
@@ -10,42 +128,100 @@ class Matcher:
     A matcher that finds the best items for answering a particular equipment query.
     """
 
-    def __init__(self, language: Language):
+    def __init__(
+        self,
+        language: Language,
+        encoder: Optional[Encoder] = None,
+        batching: Optional[Batching] = None,
+        lemmatize: bool = True,
+    ):
+        self.lemmatize = lemmatize
         self.nlp = spacy.load(
             "en_core_web_sm" if language == Language.EN else "fr_core_news_sm",
             exclude=["ner"],
         )
-        self.model = SentenceTransformer("distiluse-base-multilingual-cased-v1")
+        self.encoder = build_encoder(encoder if encoder else Encoder())
+        self.scheduler = EncodingScheduler(
+            self.encoder, batching if batching else Batching()
+        )
+
+    def freeze(self):
+        """
+        Makes the models read-only, so that the pages holding them can be shared copy-on-write
+        by forked processes.
+        """
+        self.encoder.freeze()
+
+    def encode_candidates(self, candidates: List[Item]) -> EncodedCandidates:
+        """
+        Lemmatizes and encodes the given candidates, so that they can be matched against any
+        number of queries.
+        """
+        builder = EncodedCandidatesBuilder(self)
+        builder.add(candidates)
+        return builder.build()
 
-    def find_matches(self, query: Item, candidates: List[Item]) -> List[Item]:
+    def encode_sentences(self, sentences: List[str]):
+        """
+        Lemmatizes and encodes the given sentences, returning a matrix with one embedding per row.
+        """
+        return self._compute_embedding(list(map(self._lemmatize, sentences)))
+
+    def find_matches(
+        self,
+        query: Item,
+        candidates: EncodedCandidates,
+        threshold: float = MATCH_THRESHOLD,
+    ) -> List[Item]:
         """
         Finds the best matches for the given query, returning the objects sorted in order of
         similarity (descending order).
         """
         print("Finding matches...")
-        query_emb = self._compute_embedding(self._lemmatize(query.to_sentence()))
-        candidates_embs = self._compute_embedding(
-            list(map(lambda c: self._lemmatize(c.to_sentence()), candidates))
-        )
-        similarities = []
-        for i, p in enumerate(candidates_embs):
-            sim = self._cosine_similarity(query_emb, p)
-            similarities.append((i, sim))
-        indexes, _ = zip(
-            *list(
-                filter(
-                    lambda s: s[1] >= 0.6,
-                    sorted(similarities, key=lambda p: p[1], reverse=True),
-                )
+        matches = list(
+            filter(
+                lambda s: s[1] >= threshold,
+                sorted(
+                    enumerate(self.similarities(query, candidates)),
+                    key=lambda p: p[1],
+                    reverse=True,
+                ),
             )
         )
-        return [candidates[i] for i in indexes]
+        return [candidates.items[i] for g, _ in matches for i in candidates.groups[g]]
+
+    def rank_matches(
+        self,
+        query: Item,
+        candidates: EncodedCandidates,
+        first: int,
+        threshold: float = MATCH_THRESHOLD,
+    ) -> RankedMatches:
+        """
+        Finds the matches for the given query, only sorting the `first` best groups of candidates
+        right away.
+        """
+        print("Ranking matches...")
+        return RankedMatches(
+            candidates, self.similarities(query, candidates), threshold, first
+        )
+
+    def similarities(self, query: Item, candidates: EncodedCandidates) -> List[float]:
+        """
+        Computes the similarity between the given query and each group of candidates.
+        """
+        query_emb = self._compute_embedding(self._lemmatize(query.to_sentence()))
+        return [self._cosine_similarity(query_emb, p) for p in candidates.embeddings]
 
     def _lemmatize(self, sentence: str):
+        if not self.lemmatize:
+            return sentence
         return " ".join([w.lemma_ for w in self.nlp(sentence) if not w.is_stop])
 
     def _compute_embedding(self, sentences: Union[str, List[str]]):
-        return self.model.encode(sentences)
+        if isinstance(sentences, str):
+            return self.encoder.encode(sentences)
+        return self.scheduler.encode(sentences)
 
     def _cosine_similarity(self, v1, v2):
         return 1 - cosine(v1, v2)
@@ -0,0 +1,55 @@
+import asyncio
+from typing import Callable, Dict, Optional
+
+
+class Metrics:
+    """
+    A registry of the connector's counters and gauges.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, float] = {}
+        self._gauges: Dict[str, Callable[[], Optional[float]]] = {}
+
+    def increment(self, name: str, value: float = 1):
+        """
+        Increments the given counter by the given value.
+        """
+        self._values[name] = self._values.get(name, 0) + value
+
+    def set(self, name: str, value: float):
+        """
+        Sets the given metric to the given value.
+        """
+        self._values[name] = value
+
+    def gauge(self, name: str, getter: Callable[[], Optional[float]]):
+        """
+        Registers a gauge, whose value is computed by the given function every time the metrics
+        are read.
+        """
+        self._gauges[name] = getter
+
+    def serialize(self) -> Dict[str, Optional[float]]:
+        """
+        Serializes the metrics to a dictionary.
+        """
+        d: Dict[str, Optional[float]] = dict(self._values)
+        for name, getter in self._gauges.items():
+            d[name] = getter()
+
+        return dict(sorted(d.items()))
+
+    async def report(self, interval: float):
+        """
+        Prints the metrics every `interval` seconds, forever.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            print(f"Metrics: {self}")
+
+    def __repr__(self) -> str:
+        return str(self.serialize())
+
+
+metrics = Metrics()
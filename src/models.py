@@ -15,12 +15,16 @@ class Item:
         model: str,
         condition: Optional[str] = None,
         id: Optional[str] = None,
+        source: Optional[str] = None,
     ):
         self.type = type
         self.manufacturer = manufacturer
         self.model = model
         self.condition = condition
         self.id = id
+        # The index of the source the item comes from, in multi-source configurations, as ids
+        # are only unique within a source
+        self.source = source
 
     @staticmethod
     def deserialize(obj: Dict[str, str]):
@@ -46,6 +50,9 @@ class Item:
         if self.id:
             d["id"] = self.id
 
+        if self.source is not None:
+            d["source"] = self.source
+
         return d
 
     def __repr__(self) -> str:
@@ -68,6 +75,7 @@ class ConnectionType(Enum):
 
     DB = "DB"
     API = "API"
+    MULTI = "MULTI"
 
 
 class HttpMethod(Enum):
@@ -145,6 +153,185 @@ class Fields:
         return False
 
 
+class Refresh:
+    """
+    The inventory refresh settings.
+    """
+
+    def __init__(self, interval: float = 60):
+        self.interval = interval
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.__dict__ == other.__dict__
+        return False
+
+
+class EncoderBackend(Enum):
+    """
+    The backend used for computing the embeddings.
+    """
+
+    TORCH = "torch"
+    ONNX = "onnx"
+
+    @classmethod
+    def values(cls):
+        return list(map(lambda c: c.value, cls))
+
+
+class Encoder:
+    """
+    The encoder settings.
+    """
+
+    def __init__(
+        self,
+        backend: EncoderBackend = EncoderBackend.TORCH,
+        path: Optional[str] = None,
+        quantized: bool = True,
+        threads: Optional[int] = None,
+        parity_check: bool = False,
+        parity_threshold: float = 0.98,
+    ):
+        self.backend = backend
+        self.path = path
+        self.quantized = quantized
+        self.threads = threads
+        self.parity_check = parity_check
+        self.parity_threshold = parity_threshold
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.__dict__ == other.__dict__
+        return False
+
+
+class Batching:
+    """
+    The candidates encoding batching settings.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, memory_cap_mb: float = 512):
+        # None for choosing the batch size adaptively
+        self.batch_size = batch_size
+        self.memory_cap_mb = memory_cap_mb
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.__dict__ == other.__dict__
+        return False
+
+
+class Admission:
+    """
+    The admission control settings of incoming requests.
+    """
+
+    def __init__(
+        self, queue_size: int = 64, workers: int = 4, deadline: Optional[float] = None
+    ):
+        self.queue_size = queue_size
+        self.workers = workers
+        # None for no deadline
+        self.deadline = deadline
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.__dict__ == other.__dict__
+        return False
+
+
+class ProfilingMode(Enum):
+    """
+    The profiler used for profiling requests.
+    """
+
+    SAMPLING = "sampling"
+    CPROFILE = "cprofile"
+
+    @classmethod
+    def values(cls):
+        return list(map(lambda c: c.value, cls))
+
+
+class Profiling:
+    """
+    The request profiling settings.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0,
+        threshold_ms: Optional[float] = None,
+        mode: ProfilingMode = ProfilingMode.SAMPLING,
+        interval_ms: float = 5,
+        tracemalloc: bool = False,
+        directory: str = "profiles",
+        max_files: int = 50,
+    ):
+        # The fraction of requests profiled
+        self.sample_rate = sample_rate
+        # Requests slower than this are profiled too. None for profiling only sampled requests
+        self.threshold_ms = threshold_ms
+        self.mode = mode
+        self.interval_ms = interval_ms
+        self.tracemalloc = tracemalloc
+        self.directory = directory
+        self.max_files = max_files
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.threshold_ms is not None
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.__dict__ == other.__dict__
+        return False
+
+
+class WireFormat(Enum):
+    """
+    The format of the messages exchanged with the server.
+    """
+
+    JSON = "json"
+    MSGPACK = "msgpack"
+    COLUMNAR = "columnar"
+
+    @classmethod
+    def values(cls):
+        return list(map(lambda c: c.value, cls))
+
+
+class Communication:
+    """
+    The settings of the communication with the server.
+    """
+
+    def __init__(
+        self,
+        compression: bool = True,
+        compression_level: Optional[int] = None,
+        formats: Optional[List[WireFormat]] = None,
+        chunk_size: Optional[int] = None,
+    ):
+        # Whether to negotiate permessage-deflate
+        self.compression = compression
+        # None for the default zlib compression level
+        self.compression_level = compression_level
+        # The formats offered to the server, by order of preference. Plain JSON if none is accepted
+        self.formats = formats if formats else []
+        # The maximum number of items per message, streaming the responses. None for sending each
+        # response in a single message
+        self.chunk_size = chunk_size
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.__dict__ == other.__dict__
+        return False
+
+
 class Config(ABC):
     """
     A configuration.
@@ -154,16 +341,65 @@ class Config(ABC):
         self,
         id: int,
         type: ConnectionType,
-        url: str,
         token: str,
         language: Language,
-        fields: Fields,
+        refresh: Optional[Refresh] = None,
+        encoder: Optional[Encoder] = None,
+        batching: Optional[Batching] = None,
+        admission: Optional[Admission] = None,
+        profiling: Optional[Profiling] = None,
+        communication: Optional[Communication] = None,
     ):
         self.id = id
         self.type = type
-        self.url = url
         self.token = token
         self.language = language
+        self.refresh = refresh if refresh else Refresh()
+        self.encoder = encoder if encoder else Encoder()
+        self.batching = batching if batching else Batching()
+        self.admission = admission if admission else Admission()
+        self.profiling = profiling if profiling else Profiling()
+        self.communication = communication if communication else Communication()
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.__dict__ == other.__dict__
+        return False
+
+
+class SourceConfig(Config):
+    """
+    A configuration for a single inventory source.
+    """
+
+    def __init__(
+        self,
+        id: int,
+        type: ConnectionType,
+        url: str,
+        token: str,
+        language: Language,
+        fields: Fields,
+        refresh: Optional[Refresh] = None,
+        encoder: Optional[Encoder] = None,
+        batching: Optional[Batching] = None,
+        admission: Optional[Admission] = None,
+        profiling: Optional[Profiling] = None,
+        communication: Optional[Communication] = None,
+    ):
+        super().__init__(
+            id,
+            type,
+            token,
+            language,
+            refresh,
+            encoder,
+            batching,
+            admission,
+            profiling,
+            communication,
+        )
+        self.url = url
         self.fields = fields
 
     def __eq__(self, other):
@@ -172,7 +408,7 @@ class Config(ABC):
         return False
 
 
-class DbConfig(Config):
+class DbConfig(SourceConfig):
     """
     A configuration for a DB connection.
     """
@@ -186,8 +422,27 @@ class DbConfig(Config):
         language: Language,
         fields: Fields,
         table: str,
+        refresh: Optional[Refresh] = None,
+        encoder: Optional[Encoder] = None,
+        batching: Optional[Batching] = None,
+        admission: Optional[Admission] = None,
+        profiling: Optional[Profiling] = None,
+        communication: Optional[Communication] = None,
     ):
-        super().__init__(id, type, url, token, language, fields)
+        super().__init__(
+            id,
+            type,
+            url,
+            token,
+            language,
+            fields,
+            refresh,
+            encoder,
+            batching,
+            admission,
+            profiling,
+            communication,
+        )
         self.table = table
 
     def __eq__(self, other):
@@ -196,7 +451,7 @@ class DbConfig(Config):
         return False
 
 
-class ApiConfig(Config):
+class ApiConfig(SourceConfig):
     """
     A configuration for an API connection.
     """
@@ -210,11 +465,84 @@ class ApiConfig(Config):
         language: Language,
         fields: Fields,
         endpoint: Endpoint,
+        refresh: Optional[Refresh] = None,
+        encoder: Optional[Encoder] = None,
+        batching: Optional[Batching] = None,
+        admission: Optional[Admission] = None,
+        profiling: Optional[Profiling] = None,
+        communication: Optional[Communication] = None,
     ):
-        super().__init__(id, type, url, token, language, fields)
+        super().__init__(
+            id,
+            type,
+            url,
+            token,
+            language,
+            fields,
+            refresh,
+            encoder,
+            batching,
+            admission,
+            profiling,
+            communication,
+        )
         self.endpoint = endpoint
 
     def __eq__(self, other):
         if type(other) is type(self):
             return self.__dict__ == other.__dict__
         return False
+
+
+class Source:
+    """
+    One of the sources of a multi-source configuration.
+    """
+
+    def __init__(self, config: SourceConfig, timeout: float = 30):
+        self.config = config
+        self.timeout = timeout
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.__dict__ == other.__dict__
+        return False
+
+
+class MultiConfig(Config):
+    """
+    A configuration for several sources, queried concurrently.
+    """
+
+    def __init__(
+        self,
+        id: int,
+        type: ConnectionType,
+        token: str,
+        language: Language,
+        sources: List[Source],
+        refresh: Optional[Refresh] = None,
+        encoder: Optional[Encoder] = None,
+        batching: Optional[Batching] = None,
+        admission: Optional[Admission] = None,
+        profiling: Optional[Profiling] = None,
+        communication: Optional[Communication] = None,
+    ):
+        super().__init__(
+            id,
+            type,
+            token,
+            language,
+            refresh,
+            encoder,
+            batching,
+            admission,
+            profiling,
+            communication,
+        )
+        self.sources = sources
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self.__dict__ == other.__dict__
+        return False
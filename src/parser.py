@@ -2,18 +2,30 @@ import json
 import os
 import re
 from src.models import (
+    Admission,
     ApiConfig,
+    Batching,
+    Communication,
     Condition,
     Config,
     ConnectionType,
     DbConfig,
+    Encoder,
+    EncoderBackend,
     Endpoint,
     Fields,
     HttpMethod,
     Language,
+    MultiConfig,
+    Profiling,
+    ProfilingMode,
+    Refresh,
+    Source,
+    SourceConfig,
+    WireFormat,
 )
 
-from typing import Tuple
+from typing import Optional, Tuple
 
 
 class ParserException(Exception):
@@ -41,22 +53,82 @@ class ConfigParser:
             raise ParserException(f"File {config_filename} does not exist")
 
     def _validate(self, config: dict) -> Tuple[bool, str]:
+        required_keys = ["id", "type", "token", "language"]
+        if not all(k in config for k in required_keys):
+            return False, f"One of the required keys {required_keys} is missing"
+
+        if not config["id"]:
+            return False, "Empty 'id' field"
+
+        if not config["token"]:
+            return False, "Empty 'token' field"
+
+        if "refresh" in config:
+            valid, error = self._validate_refresh(config["refresh"])
+            if not valid:
+                return valid, error
+
+        if "encoder" in config:
+            valid, error = self._validate_encoder(config["encoder"])
+            if not valid:
+                return valid, error
+
+        if "batching" in config:
+            valid, error = self._validate_batching(config["batching"])
+            if not valid:
+                return valid, error
+
+        if "admission" in config:
+            valid, error = self._validate_admission(config["admission"])
+            if not valid:
+                return valid, error
+
+        if "profiling" in config:
+            valid, error = self._validate_profiling(config["profiling"])
+            if not valid:
+                return valid, error
+
+        if "communication" in config:
+            valid, error = self._validate_communication(config["communication"])
+            if not valid:
+                return valid, error
+
+        if config["type"] != ConnectionType.MULTI.value:
+            return self._validate_source(config)
+
+        if "sources" not in config:
+            return False, "Key 'sources' is missing"
+
+        sources = config["sources"]
+        if not sources:
+            return False, "Empty 'sources' field"
+
+        for i, source in enumerate(sources):
+            valid, error = self._validate_source(source)
+            if not valid:
+                return False, f"Source {i} not valid: {error}"
+
+            if "timeout" in source:
+                timeout = source["timeout"]
+                if type(timeout) not in (int, float) or timeout <= 0:
+                    return (
+                        False,
+                        f"Source {i} not valid: Invalid 'timeout' value: {timeout}",
+                    )
+
+        return True, "Valid"
+
+    def _validate_source(self, config: dict) -> Tuple[bool, str]:
         def remove_braces(s: str) -> str:
             s = s.replace("{", "")
             s = s.replace("}", "")
             return s
 
-        required_keys = ["id", "type", "url", "token", "language", "fields"]
+        required_keys = ["type", "url", "fields"]
         if all(k in config for k in required_keys):
-            if not config["id"]:
-                return False, "Empty 'id' field"
-
             if not config["url"]:
                 return False, "Empty 'url' field"
 
-            if not config["token"]:
-                return False, "Empty 'token' field"
-
             fields = config["fields"]
             if not fields:
                 return False, "Empty 'fields' field"
@@ -165,16 +237,263 @@ class ConfigParser:
 
         return True, "Valid"
 
+    def _validate_refresh(self, refresh: dict) -> Tuple[bool, str]:
+        if not refresh:
+            return False, "Empty 'refresh' field"
+
+        if "interval" not in refresh:
+            return False, "Key 'interval' is missing in 'refresh'"
+
+        interval = refresh["interval"]
+        if type(interval) not in (int, float) or interval <= 0:
+            return False, f"Invalid 'interval' value: {interval}"
+
+        return True, "Valid"
+
+    def _validate_encoder(self, encoder: dict) -> Tuple[bool, str]:
+        if not encoder:
+            return False, "Empty 'encoder' field"
+
+        if "backend" not in encoder:
+            return False, "Key 'backend' is missing in 'encoder'"
+
+        backend = encoder["backend"]
+        if backend not in EncoderBackend.values():
+            return False, f"Unknown 'backend' value: {backend}"
+
+        if backend == EncoderBackend.ONNX.value and not encoder.get("path"):
+            return False, "Key 'path' is missing or empty in 'encoder'"
+
+        for key in ["quantized", "parityCheck"]:
+            if key in encoder and type(encoder[key]) is not bool:
+                return False, f"Invalid '{key}' value: {encoder[key]}"
+
+        if "threads" in encoder:
+            threads = encoder["threads"]
+            if type(threads) is not int or threads <= 0:
+                return False, f"Invalid 'threads' value: {threads}"
+
+        if "parityThreshold" in encoder:
+            threshold = encoder["parityThreshold"]
+            if type(threshold) not in (int, float) or not 0 < threshold <= 1:
+                return False, f"Invalid 'parityThreshold' value: {threshold}"
+
+        return True, "Valid"
+
+    def _validate_batching(self, batching: dict) -> Tuple[bool, str]:
+        if not batching:
+            return False, "Empty 'batching' field"
+
+        if "batchSize" in batching:
+            batch_size = batching["batchSize"]
+            if batch_size != "auto" and (
+                type(batch_size) is not int or batch_size <= 0
+            ):
+                return False, f"Invalid 'batchSize' value: {batch_size}"
+
+        if "memoryCapMb" in batching:
+            memory_cap = batching["memoryCapMb"]
+            if type(memory_cap) not in (int, float) or memory_cap <= 0:
+                return False, f"Invalid 'memoryCapMb' value: {memory_cap}"
+
+        return True, "Valid"
+
+    def _validate_admission(self, admission: dict) -> Tuple[bool, str]:
+        if not admission:
+            return False, "Empty 'admission' field"
+
+        for key in ["queueSize", "workers"]:
+            if key in admission:
+                value = admission[key]
+                if type(value) is not int or value <= 0:
+                    return False, f"Invalid '{key}' value: {value}"
+
+        if "deadline" in admission:
+            deadline = admission["deadline"]
+            if type(deadline) not in (int, float) or deadline <= 0:
+                return False, f"Invalid 'deadline' value: {deadline}"
+
+        return True, "Valid"
+
+    def _validate_profiling(self, profiling: dict) -> Tuple[bool, str]:
+        if not profiling:
+            return False, "Empty 'profiling' field"
+
+        if "sampleRate" not in profiling and "thresholdMs" not in profiling:
+            return False, "One of the keys [sampleRate, thresholdMs] is missing"
+
+        if "sampleRate" in profiling:
+            sample_rate = profiling["sampleRate"]
+            if type(sample_rate) not in (int, float) or not 0 <= sample_rate <= 1:
+                return False, f"Invalid 'sampleRate' value: {sample_rate}"
+
+        for key in ["thresholdMs", "intervalMs"]:
+            if key in profiling:
+                value = profiling[key]
+                if type(value) not in (int, float) or value <= 0:
+                    return False, f"Invalid '{key}' value: {value}"
+
+        if "mode" in profiling and profiling["mode"] not in ProfilingMode.values():
+            return False, f"Unknown 'mode' value: {profiling['mode']}"
+
+        if "tracemalloc" in profiling and type(profiling["tracemalloc"]) is not bool:
+            return False, f"Invalid 'tracemalloc' value: {profiling['tracemalloc']}"
+
+        if "directory" in profiling and not profiling["directory"]:
+            return False, "Empty 'directory' field"
+
+        if "maxFiles" in profiling:
+            max_files = profiling["maxFiles"]
+            if type(max_files) is not int or max_files <= 0:
+                return False, f"Invalid 'maxFiles' value: {max_files}"
+
+        return True, "Valid"
+
+    def _validate_communication(self, communication: dict) -> Tuple[bool, str]:
+        if not communication:
+            return False, "Empty 'communication' field"
+
+        if (
+            "compression" in communication
+            and type(communication["compression"]) is not bool
+        ):
+            return False, f"Invalid 'compression' value: {communication['compression']}"
+
+        if "compressionLevel" in communication:
+            level = communication["compressionLevel"]
+            if type(level) is not int or not 0 <= level <= 9:
+                return False, f"Invalid 'compressionLevel' value: {level}"
+
+        if "formats" in communication:
+            formats = communication["formats"]
+            if type(formats) is not list:
+                return False, f"Invalid 'formats' value: {formats}"
+
+            for format in formats:
+                if format not in WireFormat.values():
+                    return False, f"Unknown format: {format}"
+
+        if "chunkSize" in communication:
+            chunk_size = communication["chunkSize"]
+            if type(chunk_size) is not int or chunk_size <= 0:
+                return False, f"Invalid 'chunkSize' value: {chunk_size}"
+
+        return True, "Valid"
+
     def parse(self) -> Config:
         """
         Parses the file, returning the corresponding configuration.
         """
         id = self.config["id"]
         type = ConnectionType[self.config["type"]]
-        url = self.config["url"]
         token = self.config["token"]
         language = Language[self.config["language"].upper()]
-        fields = self.config["fields"]
+        refresh = (
+            Refresh(self.config["refresh"]["interval"])
+            if "refresh" in self.config
+            else Refresh()
+        )
+        encoder = Encoder()
+        if "encoder" in self.config:
+            encoder_dict = self.config["encoder"]
+            encoder = Encoder(
+                EncoderBackend(encoder_dict["backend"]),
+                encoder_dict.get("path"),
+                encoder_dict.get("quantized", encoder.quantized),
+                encoder_dict.get("threads"),
+                encoder_dict.get("parityCheck", encoder.parity_check),
+                encoder_dict.get("parityThreshold", encoder.parity_threshold),
+            )
+        batching = Batching()
+        if "batching" in self.config:
+            batching_dict = self.config["batching"]
+            batch_size = batching_dict.get("batchSize", "auto")
+            batching = Batching(
+                None if batch_size == "auto" else batch_size,
+                batching_dict.get("memoryCapMb", batching.memory_cap_mb),
+            )
+        admission = Admission()
+        if "admission" in self.config:
+            admission_dict = self.config["admission"]
+            admission = Admission(
+                admission_dict.get("queueSize", admission.queue_size),
+                admission_dict.get("workers", admission.workers),
+                admission_dict.get("deadline"),
+            )
+        profiling = Profiling()
+        if "profiling" in self.config:
+            profiling_dict = self.config["profiling"]
+            profiling = Profiling(
+                profiling_dict.get("sampleRate", profiling.sample_rate),
+                profiling_dict.get("thresholdMs"),
+                ProfilingMode(profiling_dict.get("mode", profiling.mode.value)),
+                profiling_dict.get("intervalMs", profiling.interval_ms),
+                profiling_dict.get("tracemalloc", profiling.tracemalloc),
+                profiling_dict.get("directory", profiling.directory),
+                profiling_dict.get("maxFiles", profiling.max_files),
+            )
+        communication = Communication()
+        if "communication" in self.config:
+            communication_dict = self.config["communication"]
+            communication = Communication(
+                communication_dict.get("compression", communication.compression),
+                communication_dict.get("compressionLevel"),
+                [WireFormat(f) for f in communication_dict.get("formats", [])],
+                communication_dict.get("chunkSize"),
+            )
+
+        if type == ConnectionType.MULTI:
+            sources = []
+            for source_dict in self.config["sources"]:
+                source = self._parse_source(source_dict, id, token, language)
+                sources.append(
+                    Source(source, source_dict["timeout"])
+                    if "timeout" in source_dict
+                    else Source(source)
+                )
+            return MultiConfig(
+                id,
+                type,
+                token,
+                language,
+                sources,
+                refresh,
+                encoder,
+                batching,
+                admission,
+                profiling,
+                communication,
+            )
+
+        return self._parse_source(
+            self.config,
+            id,
+            token,
+            language,
+            refresh,
+            encoder,
+            batching,
+            admission,
+            profiling,
+            communication,
+        )
+
+    def _parse_source(
+        self,
+        source: dict,
+        id: int,
+        token: str,
+        language: Language,
+        refresh: Optional[Refresh] = None,
+        encoder: Optional[Encoder] = None,
+        batching: Optional[Batching] = None,
+        admission: Optional[Admission] = None,
+        profiling: Optional[Profiling] = None,
+        communication: Optional[Communication] = None,
+    ) -> SourceConfig:
+        type = ConnectionType[source["type"]]
+        url = source["url"]
+        fields = source["fields"]
 
         condition = fields["condition"]
         fields = Fields(
@@ -186,10 +505,24 @@ class ConfigParser:
         )
 
         if type == ConnectionType.DB:
-            table = self.config["table"]
-            return DbConfig(id, type, url, token, language, fields, table)
+            table = source["table"]
+            return DbConfig(
+                id,
+                type,
+                url,
+                token,
+                language,
+                fields,
+                table,
+                refresh,
+                encoder,
+                batching,
+                admission,
+                profiling,
+                communication,
+            )
         else:
-            endpoint_dict = self.config["endpoint"]
+            endpoint_dict = source["endpoint"]
             params_dict = endpoint_dict["parameters"]
             endpoint = Endpoint(
                 endpoint_dict["auth"],
@@ -198,4 +531,18 @@ class ConfigParser:
                 dict(params_dict["query"]),
                 dict(params_dict["path"]),
             )
-            return ApiConfig(id, type, url, token, language, fields, endpoint)
+            return ApiConfig(
+                id,
+                type,
+                url,
+                token,
+                language,
+                fields,
+                endpoint,
+                refresh,
+                encoder,
+                batching,
+                admission,
+                profiling,
+                communication,
+            )
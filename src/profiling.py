@@ -0,0 +1,267 @@
+import asyncio
+import cProfile
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, Dict, List, Optional, TypeVar
+from src.communication import Request
+from src.metrics import metrics
+from src.models import Profiling, ProfilingMode
+
+# Number of lines with the largest allocations written for tracemalloc snapshots
+TRACEMALLOC_TOP_LINES = 25
+
+T = TypeVar("T")
+
+# The cProfile profiler of the request being handled, if it is profiled in cprofile mode
+_request_profile: ContextVar[Optional[cProfile.Profile]] = ContextVar(
+    "request_profile", default=None
+)
+
+
+class StackSampler:
+    """
+    A sampling profiler: a background thread periodically records the stacks of all the other
+    threads (event loop and executor threads alike), in the collapsed format understood by
+    flame graph tools. The samples taken while a request is being profiled include everything
+    running at that time, including other concurrent requests.
+    """
+
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._collectors: List[Counter] = []
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> Counter:
+        """
+        Starts collecting samples, returning the counter of collapsed stacks they are added to.
+        """
+        collector: Counter = Counter()
+        with self._lock:
+            self._collectors.append(collector)
+            self._active.set()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="stack-sampler", daemon=True
+                )
+                self._thread.start()
+        return collector
+
+    def stop(self, collector: Counter):
+        """
+        Stops adding samples to the given counter.
+        """
+        with self._lock:
+            self._collectors.remove(collector)
+            if not self._collectors:
+                self._active.clear()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            self._active.wait()
+            time.sleep(self._interval)
+
+            names = {t.ident: t.name for t in threading.enumerate()}
+            stacks = [
+                self._collapse(names.get(thread_id, str(thread_id)), frame)
+                for thread_id, frame in sys._current_frames().items()
+                if thread_id != own_id
+            ]
+            with self._lock:
+                for collector in self._collectors:
+                    collector.update(stacks)
+
+    def _collapse(self, thread_name: str, frame) -> str:
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+            )
+            frame = frame.f_back
+        frames.append(thread_name)
+        return ";".join(reversed(frames))
+
+
+def profiled(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    Returns the given function, profiled with the cProfile profiler of the request being handled,
+    if any. Meant for the functions run in the executor on behalf of a request: a profiler only
+    sees the thread it is enabled in.
+    """
+    profile = _request_profile.get()
+    if profile is None:
+        return fn
+
+    def run(*args):
+        profile.enable()
+        try:
+            return fn(*args)
+        finally:
+            profile.disable()
+
+    return run
+
+
+class RequestProfiler:
+    """
+    Profiles a fraction of the requests, and every request slower than a threshold, writing the
+    profiles to a directory in which only the latest ones are kept. Each profile comes with a
+    JSON file describing the request and the duration of its stages.
+
+    Whether a request is slow is only known once it has been handled: with a threshold, every
+    request is profiled (though only the slow ones are written), so the stack sampler runs
+    whenever a request is being handled, or cProfile is enabled for each request in turn. Memory
+    allocations are only traced for sampled requests.
+    """
+
+    def __init__(self, profiling: Profiling):
+        self._profiling = profiling
+        self._sampler = StackSampler(profiling.interval_ms / 1000)
+        # cProfile can only profile one request at a time
+        self._cprofile_busy = False
+        # Number of requests being handled while tracing memory allocations
+        self._tracing = 0
+        self._started_tracing = False
+        os.makedirs(profiling.directory, exist_ok=True)
+
+    def wrap(
+        self, handler: Callable[[Request], Coroutine[Any, Any, Any]]
+    ) -> Callable[[Request], Coroutine[Any, Any, Any]]:
+        """
+        Returns a handler profiling the given one.
+        """
+        return lambda request: self.profile(handler, request)
+
+    async def profile(
+        self, handler: Callable[[Request], Coroutine[Any, Any, Any]], request: Request
+    ):
+        """
+        Handles the given request with the given handler, profiling it if needed.
+        """
+        sampled = random.random() < self._profiling.sample_rate
+        if not sampled and self._profiling.threshold_ms is None:
+            return await handler(request)
+
+        use_cprofile = self._profiling.mode == ProfilingMode.CPROFILE
+        if use_cprofile and self._cprofile_busy:
+            metrics.increment("profiles_skipped")
+            return await handler(request)
+
+        trace = sampled and self._profiling.tracemalloc
+        if trace:
+            self._start_tracing()
+        if use_cprofile:
+            self._cprofile_busy = True
+            profile = cProfile.Profile()
+            token = _request_profile.set(profile)
+        else:
+            collector = self._sampler.start()
+
+        start = time.perf_counter()
+        try:
+            return await handler(request)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if use_cprofile:
+                _request_profile.reset(token)
+                self._cprofile_busy = False
+            else:
+                self._sampler.stop(collector)
+
+            snapshot = None
+            if trace:
+                # Not taken on the event loop, as it walks all the traced allocations
+                snapshot = await asyncio.get_running_loop().run_in_executor(
+                    None, tracemalloc.take_snapshot
+                )
+                self._stop_tracing()
+
+            slow = (
+                self._profiling.threshold_ms is not None
+                and duration_ms >= self._profiling.threshold_ms
+            )
+            if sampled or slow:
+                base = self._write_metadata(
+                    request, duration_ms, sampled, slow, snapshot
+                )
+                if use_cprofile:
+                    profile.dump_stats(f"{base}.prof")
+                else:
+                    with open(f"{base}.folded", "w") as folded_file:
+                        for stack, count in collector.most_common():
+                            folded_file.write(f"{stack} {count}\n")
+                metrics.increment("profiles_written")
+                self._rotate()
+
+    def _start_tracing(self):
+        if self._tracing == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._tracing += 1
+
+    def _stop_tracing(self):
+        self._tracing -= 1
+        if self._tracing == 0 and self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _write_metadata(
+        self,
+        request: Request,
+        duration_ms: float,
+        sampled: bool,
+        slow: bool,
+        snapshot: Optional[tracemalloc.Snapshot],
+    ) -> str:
+        item = request.item
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", item.to_sentence()).strip("-")[:40]
+        base = os.path.join(
+            self._profiling.directory,
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{int(duration_ms)}ms-{slug}-{id(request)}",
+        )
+        metadata: Dict[str, Any] = {
+            "item": item.serialize(),
+            "request_id": request.id,
+            "duration_ms": duration_ms,
+            "timings_ms": {
+                stage: seconds * 1000 for stage, seconds in request.timings.items()
+            },
+            "reason": "slow" if slow else "sampled",
+            "mode": self._profiling.mode.value,
+        }
+        if snapshot is not None:
+            metadata["tracemalloc"] = [
+                str(statistic)
+                for statistic in snapshot.statistics("lineno")[:TRACEMALLOC_TOP_LINES]
+            ]
+
+        with open(f"{base}.json", "w") as metadata_file:
+            json.dump(metadata, metadata_file, indent=2, ensure_ascii=False)
+        return base
+
+    def _rotate(self):
+        directory = self._profiling.directory
+        profiles = sorted(
+            (
+                os.path.join(directory, f)
+                for f in os.listdir(directory)
+                if f.endswith(".json")
+            ),
+            key=os.path.getmtime,
+        )
+        for metadata_filename in profiles[: -self._profiling.max_files]:
+            base = metadata_filename[: -len(".json")]
+            for extension in [".json", ".prof", ".folded"]:
+                if os.path.exists(base + extension):
+                    os.remove(base + extension)
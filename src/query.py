@@ -1,10 +1,25 @@
-from typing import Any, Dict, List, cast
-from src.models import ApiConfig, Config, DbConfig, HttpMethod, Item
+from typing import Any, AsyncIterator, Dict, List, cast
+from src.metrics import metrics
+from src.models import (
+    ApiConfig,
+    Config,
+    ConnectionType,
+    DbConfig,
+    HttpMethod,
+    Item,
+    MultiConfig,
+    Source,
+)
+from src.streaming import JsonArrayParser
 from databases import Database
 from abc import ABC, abstractmethod
 import aiohttp
+import asyncio
 import re
 
+# Number of items retrieved before being handed over, when streaming
+STREAM_CHUNK_SIZE = 1024
+
 
 class Querier(ABC):
     """
@@ -36,6 +51,15 @@ class Querier(ABC):
         """
         pass
 
+    async def stream(self, chunk_size: int) -> AsyncIterator[List[Item]]:
+        """
+        Queries the service, returning the items in chunks of at most `chunk_size` items as they
+        are retrieved.
+        """
+        items = await self.query()
+        for i in range(0, len(items), chunk_size):
+            yield items[i : i + chunk_size]
+
 
 class DbQuerier(Querier):
     """
@@ -45,7 +69,7 @@ class DbQuerier(Querier):
     def __init__(self, config: Config):
         super().__init__(config)
         self._config = cast(DbConfig, config)
-        self._database = Database(config.url)
+        self._database = Database(self._config.url)
 
     async def connect(self):
         print("Connecting to the DB...")
@@ -119,6 +143,12 @@ class ApiQuerier(Querier):
         )
 
     async def query(self) -> List[Item]:
+        items: List[Item] = []
+        async for chunk in self.stream(STREAM_CHUNK_SIZE):
+            items.extend(chunk)
+        return items
+
+    async def stream(self, chunk_size: int) -> AsyncIterator[List[Item]]:
         print("Querying the API...")
         url = self._config.url
         endpoint = self._config.endpoint
@@ -142,7 +172,73 @@ class ApiQuerier(Querier):
             async with self._session.get(
                 f"{url}/{path}", params=query_params, headers=headers
             ) as resp:
-                json = await resp.json()
-                return list(map(self._build_item, json))
-        else:
-            return []
+                # The response is parsed as it arrives
+                parser = JsonArrayParser()
+                items = []
+                async for data in resp.content.iter_any():
+                    for element in parser.feed(data):
+                        items.append(self._build_item(element))
+                        if len(items) >= chunk_size:
+                            yield items
+                            items = []
+                parser.close()
+                if items:
+                    yield items
+
+
+class FederatedQuerier(Querier):
+    """
+    Querier for several sources, queried concurrently. A source failing or not answering within
+    its timeout does not hold up the others: the items it returned last time are used instead.
+    Items are tagged with the index of their source, as their ids are only unique within it.
+    """
+
+    def __init__(self, config: Config):
+        super().__init__(config)
+        self._config = cast(MultiConfig, config)
+        self._queriers = [build_querier(s.config) for s in self._config.sources]
+        self._last_items: List[List[Item]] = [[] for _ in self._config.sources]
+
+    async def connect(self):
+        await asyncio.gather(*[q.connect() for q in self._queriers])
+
+    async def disconnect(self):
+        await asyncio.gather(*[q.disconnect() for q in self._queriers])
+
+    async def _query_source(self, index: int, source: Source, querier: Querier):
+        try:
+            items = await asyncio.wait_for(querier.query(), source.timeout)
+            for item in items:
+                item.source = str(index)
+            self._last_items[index] = items
+        except asyncio.TimeoutError:
+            metrics.increment("source_timeouts")
+            print(f"Source {index} did not answer within {source.timeout}s")
+        except Exception as e:
+            metrics.increment("source_failures")
+            print(f"Source {index} failed: {e!r}")
+        return self._last_items[index]
+
+    async def query(self) -> List[Item]:
+        print(f"Querying {len(self._queriers)} sources...")
+        results = await asyncio.gather(
+            *[
+                self._query_source(i, source, querier)
+                for i, (source, querier) in enumerate(
+                    zip(self._config.sources, self._queriers)
+                )
+            ]
+        )
+        return [item for items in results for item in items]
+
+
+def build_querier(config: Config) -> Querier:
+    """
+    Builds the querier corresponding to the given configuration.
+    """
+    if config.type == ConnectionType.DB:
+        return DbQuerier(config)
+    elif config.type == ConnectionType.API:
+        return ApiQuerier(config)
+    else:
+        return FederatedQuerier(config)
@@ -0,0 +1,98 @@
+import asyncio
+import time
+from typing import Optional, cast
+from src.match import EncodedCandidates, EncodedCandidatesBuilder, Matcher
+from src.metrics import metrics
+from src.query import STREAM_CHUNK_SIZE, Querier
+
+
+class InventorySnapshot:
+    """
+    A snapshot of the inventory, with the embeddings of its items already computed.
+    """
+
+    def __init__(self, candidates: EncodedCandidates):
+        self.candidates = candidates
+        self.created_at = time.monotonic()
+
+    def age(self) -> float:
+        """
+        Returns the age of the snapshot, in seconds.
+        """
+        return time.monotonic() - self.created_at
+
+
+class InventoryRefresher:
+    """
+    Refreshes the inventory snapshot in the background, either every `interval` seconds or
+    when a refresh is explicitly requested, so that requests never wait for the querying and
+    encoding of the inventory.
+    """
+
+    def __init__(self, querier: Querier, matcher: Matcher, interval: float):
+        self._querier = querier
+        self._matcher = matcher
+        self._interval = interval
+        self._snapshot: Optional[InventorySnapshot] = None
+        self._ready = asyncio.Event()
+        self._refresh_requested = asyncio.Event()
+        metrics.gauge("snapshot_age_seconds", self.snapshot_age)
+
+    async def run(self):
+        """
+        Refreshes the inventory forever. Failed refreshes keep serving the previous snapshot.
+        """
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                metrics.increment("refresh_failures")
+                print(f"Failed to refresh the inventory: {e!r}")
+
+            try:
+                await asyncio.wait_for(self._refresh_requested.wait(), self._interval)
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_requested.clear()
+
+    def request_refresh(self):
+        """
+        Requests a refresh of the inventory, without waiting for the interval to elapse.
+        """
+        self._refresh_requested.set()
+
+    async def refresh(self):
+        """
+        Queries the inventory and encodes its items as they are retrieved, replacing the current
+        snapshot. Only called by `run`, one refresh at a time: a refresh requested while another
+        one is running starts once it is done, so that it sees the inventory as of the request.
+        """
+        print("Refreshing the inventory...")
+        start = time.perf_counter()
+        # Each chunk is encoded as soon as it is retrieved
+        builder = EncodedCandidatesBuilder(self._matcher)
+        loop = asyncio.get_running_loop()
+        async for items in self._querier.stream(STREAM_CHUNK_SIZE):
+            await loop.run_in_executor(None, builder.add, items)
+        candidates = builder.build()
+        self._snapshot = InventorySnapshot(candidates)
+        self._ready.set()
+
+        metrics.increment("refreshes")
+        metrics.set("snapshot_items", len(candidates))
+        metrics.set("snapshot_unique_sentences", len(candidates.groups))
+        metrics.set("refresh_duration_seconds", time.perf_counter() - start)
+        print(f"Inventory refreshed with {len(candidates)} items")
+
+    async def snapshot(self) -> InventorySnapshot:
+        """
+        Returns the latest ready snapshot, waiting for the first one if needed.
+        """
+        await self._ready.wait()
+        return cast(InventorySnapshot, self._snapshot)
+
+    def snapshot_age(self) -> Optional[float]:
+        """
+        Returns the age of the latest ready snapshot, in seconds, if any.
+        """
+        return self._snapshot.age() if self._snapshot else None
@@ -0,0 +1,145 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Union
+from src.models import WireFormat
+
+# Prefix of the WebSocket subprotocols used for negotiating the format of the messages
+SUBPROTOCOL_PREFIX = "inventory."
+
+# The item fields sent as columns by the columnar format, in that order
+ITEM_COLUMNS = ["type", "manufacturer", "model", "condition", "id", "source"]
+
+
+class Codec(ABC):
+    """
+    Abstract class modeling the format of the messages exchanged with the server.
+    """
+
+    def __init__(self, format: WireFormat):
+        self.format = format
+
+    @property
+    def subprotocol(self) -> str:
+        """
+        The WebSocket subprotocol under which the format is negotiated.
+        """
+        return f"{SUBPROTOCOL_PREFIX}{self.format.value}"
+
+    @abstractmethod
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        """
+        Encodes the given message.
+        """
+        pass
+
+    @abstractmethod
+    def decode(self, data: Union[bytes, str]) -> Dict[str, Any]:
+        """
+        Decodes the given message.
+        """
+        pass
+
+
+class JsonCodec(Codec):
+    """
+    UTF-8 JSON, the format used when no other one is negotiated.
+    """
+
+    def __init__(self):
+        super().__init__(WireFormat.JSON)
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return json.dumps(message, ensure_ascii=False).encode()
+
+    def decode(self, data: Union[bytes, str]) -> Dict[str, Any]:
+        return json.loads(data.decode() if isinstance(data, bytes) else data)
+
+
+class MsgpackCodec(Codec):
+    """
+    MessagePack, a compact binary equivalent of JSON. Requires the msgpack module.
+    """
+
+    def __init__(self):
+        super().__init__(WireFormat.MSGPACK)
+        import msgpack
+
+        self._msgpack = msgpack
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        return self._msgpack.packb(message)
+
+    def decode(self, data: Union[bytes, str]) -> Dict[str, Any]:
+        return self._msgpack.unpackb(data)
+
+
+class ColumnarCodec(JsonCodec):
+    """
+    UTF-8 JSON in which the items of a response are sent as one list per field rather than as one
+    object per item, so that the field names are not repeated for each item. Fields no item has
+    are left out; items lacking a field present in others have null for it.
+    """
+
+    def __init__(self):
+        Codec.__init__(self, WireFormat.COLUMNAR)
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        if "items" in message:
+            message = {**message, "items": to_columns(message["items"])}
+        return super().encode(message)
+
+    def decode(self, data: Union[bytes, str]) -> Dict[str, Any]:
+        message = super().decode(data)
+        if isinstance(message.get("items"), dict):
+            message["items"] = from_columns(message["items"])
+        return message
+
+
+def to_columns(items: List[Dict[str, str]]) -> Dict[str, List[Optional[str]]]:
+    """
+    Converts serialized items into columns.
+    """
+    return {
+        field: [item.get(field) for item in items]
+        for field in ITEM_COLUMNS
+        if any(field in item for item in items)
+    }
+
+
+def from_columns(columns: Dict[str, List[Optional[str]]]) -> List[Dict[str, str]]:
+    """
+    Converts columns back into serialized items.
+    """
+    fields = list(columns.keys())
+    return [
+        {field: value for field, value in zip(fields, row) if value is not None}
+        for row in zip(*columns.values())
+    ]
+
+
+def build_codecs(formats: List[WireFormat]) -> List[Codec]:
+    """
+    Builds the codecs of the given formats, leaving out those whose dependencies are missing.
+    """
+    codecs: List[Codec] = []
+    for format in formats:
+        try:
+            if format == WireFormat.JSON:
+                codecs.append(JsonCodec())
+            elif format == WireFormat.MSGPACK:
+                codecs.append(MsgpackCodec())
+            else:
+                codecs.append(ColumnarCodec())
+        except ImportError as e:
+            print(f"Format '{format.value}' unavailable, not offering it: {e}")
+    return codecs
+
+
+def select_codec(codecs: List[Codec], subprotocol: Optional[str]) -> Codec:
+    """
+    Returns the codec of the subprotocol chosen by the server, or plain JSON if none was.
+    """
+    for codec in codecs:
+        if codec.subprotocol == subprotocol:
+            return codec
+    return JsonCodec()
@@ -0,0 +1,33 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from src.metrics import metrics
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing the same key into a single computation, whose result (or
+    exception) is shared by all the callers.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs the given function, unless a call with the same key is already in flight, in which
+        case its result is awaited instead.
+        """
+        future = self._in_flight.get(key)
+        if future is not None:
+            metrics.increment(f"{self._name}_coalesced")
+        else:
+            future = asyncio.ensure_future(fn())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # Shielded, so that a cancelled caller does not cancel the computation of the others
+        return await asyncio.shield(future)
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
@@ -0,0 +1,104 @@
+import codecs
+import json
+import re
+from typing import Any, List
+
+_WHITESPACE = " \t\n\r"
+
+# What may follow the position at which an element stops being valid JSON when it is only cut by
+# the end of a chunk: nothing, or the start of a number or of a literal (true, false, null...)
+_PARTIAL_TOKEN = re.compile(r"[\w.+-]*")
+
+
+class JsonArrayParser:
+    """
+    An incremental parser for a JSON document made of a top-level array. It is fed the document
+    chunk by chunk and returns the elements of the array as soon as they are complete, so that
+    neither the whole document nor the whole array has to be held in memory.
+    """
+
+    _START, _FIRST_ELEMENT, _ELEMENT, _SEPARATOR, _END = range(5)
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._position = 0
+        self._state = self._START
+
+    def feed(self, data: bytes) -> List[Any]:
+        """
+        Feeds the next chunk of the document, returning the array elements completed by it.
+        """
+        self._buffer = self._buffer[self._position :] + self._utf8.decode(data)
+        self._position = 0
+
+        elements = []
+        while self._skip_whitespace():
+            char = self._buffer[self._position]
+            if self._state == self._START:
+                self._expect(char, "[")
+                self._state = self._FIRST_ELEMENT
+            elif self._state == self._FIRST_ELEMENT and char == "]":
+                self._position += 1
+                self._state = self._END
+            elif self._state in (self._FIRST_ELEMENT, self._ELEMENT):
+                try:
+                    element, end = self._decoder.raw_decode(
+                        self._buffer, self._position
+                    )
+                except json.JSONDecodeError as e:
+                    if not self._is_incomplete(e):
+                        raise ValueError(f"Invalid array element: {e}") from e
+                    # Incomplete element, wait for more data
+                    break
+
+                # A number may continue in the next chunk: only accept an element once followed
+                # by something which cannot be part of it
+                if _PARTIAL_TOKEN.fullmatch(self._buffer, end):
+                    break
+
+                elements.append(element)
+                self._position = end
+                self._state = self._SEPARATOR
+            elif self._state == self._SEPARATOR:
+                self._expect(char, ",]")
+                self._state = self._ELEMENT if char == "," else self._END
+            else:
+                raise ValueError(
+                    f"Unexpected data after the end of the array: {char!r}"
+                )
+
+        return elements
+
+    def close(self):
+        """
+        Checks that the whole document has been fed.
+        """
+        # Raises if the document ends in the middle of a character
+        self._utf8.decode(b"", final=True)
+        if self._state != self._END or self._skip_whitespace():
+            raise ValueError("Incomplete JSON array")
+
+    def _is_incomplete(self, error: json.JSONDecodeError) -> bool:
+        """
+        Returns whether the given decoding error may only be due to the element being cut by the
+        end of the buffer, rather than to the element being invalid.
+        """
+        # Strings are reported from their start
+        if error.msg.startswith("Unterminated string"):
+            return True
+        return _PARTIAL_TOKEN.fullmatch(self._buffer, error.pos) is not None
+
+    def _skip_whitespace(self) -> bool:
+        while (
+            self._position < len(self._buffer)
+            and self._buffer[self._position] in _WHITESPACE
+        ):
+            self._position += 1
+        return self._position < len(self._buffer)
+
+    def _expect(self, char: str, expected: str):
+        if char not in expected:
+            raise ValueError(f"Expected one of {expected!r}, found {char!r}")
+        self._position += 1
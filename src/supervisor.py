@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import gc
+import os
+import signal
+import time
+from typing import Dict, List, Optional, cast
+from src.main import METRICS_REPORT_INTERVAL, main
+from src.match import Matcher
+from src.models import Config, EncoderBackend
+from src.parser import ConfigParser
+
+# Minimum number of seconds between two restarts of a worker, so that a worker failing on startup
+# does not make the supervisor spin
+RESTART_DELAY = 5
+
+# The memory fields reported for each worker, as named in /proc/<pid>/smaps_rollup
+MEMORY_FIELDS = {
+    "rss": ["Rss"],
+    "pss": ["Pss"],
+    "shared": ["Shared_Clean", "Shared_Dirty"],
+    "private": ["Private_Clean", "Private_Dirty"],
+}
+
+
+def parse_args():
+    """
+    Prepares the argument parser, parses the provided arguments and returns them.
+    """
+    parser = argparse.ArgumentParser(
+        description="Runs several inventory connector workers sharing the same models."
+    )
+    parser.add_argument(
+        "server_uri", type=str, help="the uri of the WebSockets server to connect to"
+    )
+    parser.add_argument("config", type=str, help="the name of the configuration file")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="the number of workers. Defaults to the number of CPUs",
+    )
+    parser.add_argument(
+        "--report-interval",
+        type=float,
+        default=METRICS_REPORT_INTERVAL,
+        help="the number of seconds between two reports of the memory of the workers",
+    )
+    return parser.parse_args()
+
+
+def threads_per_worker(workers: int, cpus: Optional[int]) -> int:
+    """
+    Returns the number of intra-op threads of the encoder of each worker, so that the workers do
+    not use more threads than there are CPUs between them.
+    """
+    return max(1, (cpus or 1) // workers)
+
+
+def parse_smaps_rollup(content: str) -> Dict[str, int]:
+    """
+    Parses the content of a /proc/<pid>/smaps_rollup file, returning the memory fields in kB.
+    """
+    sizes = {}
+    for line in content.splitlines():
+        parts = line.split()
+        if len(parts) == 3 and parts[0].endswith(":") and parts[2] == "kB":
+            sizes[parts[0][:-1]] = int(parts[1])
+    return {
+        field: sum(sizes.get(name, 0) for name in names)
+        for field, names in MEMORY_FIELDS.items()
+    }
+
+
+def read_memory(pid: int) -> Optional[Dict[str, int]]:
+    """
+    Returns the memory used by the given process in kB, or None if it cannot be read (on systems
+    other than Linux 4.14+).
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as smaps_file:
+            return parse_smaps_rollup(smaps_file.read())
+    except OSError:
+        return None
+
+
+class Supervisor:
+    """
+    Loads the models once, then forks the workers running the connector, which share the pages
+    holding the models copy-on-write as long as none of them writes to them. Workers that exit are
+    restarted, and the memory used by each of them is reported periodically.
+    """
+
+    def __init__(
+        self,
+        server_uri: str,
+        config_filename: str,
+        workers: int,
+        report_interval: float,
+    ):
+        self._server_uri = server_uri
+        self._config_filename = config_filename
+        self._workers = workers
+        self._report_interval = report_interval
+        self._config: Optional[Config] = None
+        self._matcher: Optional[Matcher] = None
+        self._pids: List[int] = []
+        self._stopping = False
+
+    def run(self):
+        """
+        Loads the models, starts the workers and supervises them until asked to stop.
+        """
+        # Objects allocated from now on are never collected in the supervisor, and frozen before
+        # forking: the collector of the workers then never writes to the pages holding them
+        gc.disable()
+        self._load()
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self._workers):
+            self._spawn()
+
+        last_report = time.monotonic()
+        restarts: Dict[int, float] = {}
+        while self._pids:
+            time.sleep(1)
+            for pid in list(self._pids):
+                if os.waitpid(pid, os.WNOHANG) == (0, 0):
+                    continue
+
+                self._pids.remove(pid)
+                if self._stopping:
+                    continue
+
+                print(f"Worker {pid} exited, restarting it...")
+                since_restart = time.monotonic() - restarts.pop(pid, 0)
+                if since_restart < RESTART_DELAY:
+                    time.sleep(RESTART_DELAY - since_restart)
+                # Asked to stop while waiting: the new worker would never be signaled
+                if self._stopping:
+                    continue
+                restarts[self._spawn()] = time.monotonic()
+
+            if time.monotonic() - last_report >= self._report_interval:
+                self.report()
+                last_report = time.monotonic()
+        print("All workers exited")
+
+    def report(self):
+        """
+        Prints the memory used by each worker. The proportional set size (PSS) splits the pages
+        shared by several processes between them, so that the PSS of all the workers add up to
+        the memory they actually use.
+        """
+        total_pss = 0
+        for pid in [os.getpid(), *self._pids]:
+            memory = read_memory(pid)
+            if memory is None:
+                print(f"Memory of process {pid} unavailable")
+                continue
+
+            total_pss += memory["pss"]
+            role = "Supervisor" if pid == os.getpid() else "Worker"
+            print(
+                f"{role} {pid}: RSS {memory['rss'] / 1024:.1f} MB, "
+                f"PSS {memory['pss'] / 1024:.1f} MB "
+                f"(shared {memory['shared'] / 1024:.1f} MB, "
+                f"private {memory['private'] / 1024:.1f} MB)"
+            )
+        print(f"Total PSS: {total_pss / 1024:.1f} MB")
+
+    def _load(self):
+        config = ConfigParser(self._config_filename).parse()
+        # Each backend defaults to one thread per CPU: without an explicit setting, the workers
+        # would each start that many threads and compete for the CPUs
+        if not config.encoder.threads:
+            config.encoder.threads = threads_per_worker(self._workers, os.cpu_count())
+        print(f"Encoding with {config.encoder.threads} thread(s) per worker")
+        self._config = config
+
+        if config.encoder.backend == EncoderBackend.ONNX:
+            # ONNX Runtime sessions hold threads, which do not survive forking
+            print("ONNX encoder: the models are loaded by each of the workers")
+            return
+
+        print("Loading the models...")
+        self._matcher = Matcher(config.language, config.encoder, config.batching)
+        self._matcher.freeze()
+
+    def _spawn(self) -> int:
+        pid = os.fork()
+        if pid:
+            print(f"Started worker {pid}")
+            self._pids.append(pid)
+            return pid
+
+        status = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            gc.enable()
+            config = cast(Config, self._config)
+            matcher = self._matcher
+            if matcher is None:
+                matcher = Matcher(config.language, config.encoder, config.batching)
+            else:
+                import torch
+
+                # Set again in the worker, as thread pools are not inherited by forked processes
+                torch.set_num_threads(config.encoder.threads)
+            asyncio.run(main(self._server_uri, self._config_filename, matcher))
+        except BaseException as e:
+            print(f"Worker {os.getpid()} failed: {e!r}")
+            status = 1
+        finally:
+            # Never return into the supervisor's code
+            os._exit(status)
+
+    def _stop(self, signum, frame):
+        print("Stopping the workers...")
+        self._stopping = True
+        for pid in self._pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    Supervisor(args.server_uri, args.config, args.workers, args.report_interval).run()
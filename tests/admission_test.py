@@ -0,0 +1,78 @@
+import pytest
+
+pytest.importorskip("websockets")
+
+from src.admission import AdmissionController
+from src.communication import Request
+from src.models import Admission, Item
+import asyncio
+import json
+
+
+class FakeConnection:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+
+def make_request(connection, id):
+    return Request(connection, Item("bed", "Bosch", "Med231"), id)
+
+
+def test_admission_handles_requests():
+    connection = FakeConnection()
+    handled = []
+
+    async def handler(request):
+        handled.append(request.id)
+
+    async def run():
+        controller = AdmissionController(handler, Admission(4, 2))
+        worker = asyncio.ensure_future(controller.run())
+        for i in range(3):
+            await controller.submit(make_request(connection, str(i)))
+        await asyncio.sleep(0.01)
+        worker.cancel()
+
+    asyncio.run(run())
+    assert sorted(handled) == ["0", "1", "2"], "Requests not handled"
+    assert connection.sent == [], "Unexpected replies"
+
+
+def test_admission_sheds_requests_when_full():
+    connection = FakeConnection()
+
+    async def handler(request):
+        pass
+
+    async def run():
+        controller = AdmissionController(handler, Admission(2, 1))
+        for i in range(3):
+            await controller.submit(make_request(connection, str(i)))
+
+    asyncio.run(run())
+    assert connection.sent == [
+        {"found": False, "items": [], "error": "overloaded", "requestId": "2"}
+    ], "Request not shed"
+
+
+def test_admission_drops_expired_requests():
+    connection = FakeConnection()
+    handled = []
+
+    async def handler(request):
+        handled.append(request.id)
+
+    async def run():
+        controller = AdmissionController(handler, Admission(4, 1, 0.01))
+        await controller.submit(make_request(connection, "0"))
+        await asyncio.sleep(0.02)
+        worker = asyncio.ensure_future(controller.run())
+        await controller.submit(make_request(connection, "1"))
+        await asyncio.sleep(0.01)
+        worker.cancel()
+
+    asyncio.run(run())
+    assert handled == ["1"], "Expired request handled"
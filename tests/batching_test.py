@@ -0,0 +1,85 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.batching import INITIAL_BATCH_SIZE, EncodingScheduler
+from src.encoders import SentenceEncoder
+from src.models import Batching
+
+
+class FakeEncoder(SentenceEncoder):
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, sentences):
+        self.batches.append(list(sentences))
+        return np.array([[len(s.split()), sum(map(ord, s))] for s in sentences])
+
+    def count_tokens(self, sentences):
+        return [len(s.split()) for s in sentences]
+
+
+SENTENCES = [" ".join(["word"] * n + [str(i)]) for i, n in enumerate([9, 1, 5, 3] * 10)]
+
+
+def test_scheduler_restores_order():
+    encoder = FakeEncoder()
+    scheduler = EncodingScheduler(encoder, Batching(4))
+
+    embeddings = scheduler.encode(SENTENCES)
+
+    assert (embeddings == FakeEncoder().encode(SENTENCES)).all(), "Wrong order"
+
+
+def test_scheduler_batches_sentences_by_length():
+    encoder = FakeEncoder()
+    scheduler = EncodingScheduler(encoder, Batching(4))
+
+    scheduler.encode(SENTENCES)
+
+    lengths = [encoder.count_tokens(batch) for batch in encoder.batches]
+    assert all(len(batch) == 4 for batch in encoder.batches), "Wrong batch size"
+    assert all(max(a) <= min(b) for a, b in zip(lengths, lengths[1:])), "Not sorted"
+
+
+def test_scheduler_respects_memory_cap():
+    encoder = FakeEncoder()
+    scheduler = EncodingScheduler(encoder, Batching(64, 0.5))
+
+    scheduler.encode(SENTENCES)
+
+    assert max(map(len, encoder.batches)) < 64, "Memory cap not applied"
+    assert sum(map(len, encoder.batches)) == len(SENTENCES), "Sentences lost"
+
+
+def test_scheduler_adapts_batch_size():
+    encoder = FakeEncoder()
+    scheduler = EncodingScheduler(encoder, Batching())
+
+    first = scheduler.batch_size
+    # Sentences of the same length, so that a single batch size is explored: 32, then 64
+    scheduler.encode([f"word {i}" for i in range(100)])
+
+    assert scheduler.batch_size != first, "Batch size not adapted"
+
+
+def test_scheduler_adapts_batch_size_per_sentence_length():
+    encoder = FakeEncoder()
+    scheduler = EncodingScheduler(encoder, Batching())
+    short = [f"word {i}" for i in range(2000)]
+    long = [" ".join(["word"] * 40 + [str(i)]) for i in range(100)]
+
+    scheduler.encode(short)
+    encoder.batches = []
+    scheduler.encode(long)
+
+    assert scheduler.batch_size != INITIAL_BATCH_SIZE, "Batch size not adapted"
+    assert (
+        len(encoder.batches[0]) == INITIAL_BATCH_SIZE
+    ), "Batch sizes compared on sentences of different lengths"
+
+
+def test_scheduler_encodes_nothing():
+    scheduler = EncodingScheduler(FakeEncoder(), Batching())
+
+    assert len(scheduler.encode([])) == 0, "Wrong embeddings"
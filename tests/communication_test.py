@@ -0,0 +1,91 @@
+import pytest
+
+websockets = pytest.importorskip("websockets")
+
+from src.communication import Client, Request, Response
+from src.models import Communication, Item, WireFormat
+from src.serialization import ColumnarCodec
+import asyncio
+import json
+
+
+def test_client_negotiates_format_and_compression():
+    async def run():
+        received = asyncio.get_running_loop().create_future()
+
+        async def server_handler(websocket, path):
+            codec = ColumnarCodec()
+            await websocket.send(
+                codec.encode(
+                    {
+                        "type": "bed",
+                        "manufacturer": "Bosch",
+                        "model": "Med231",
+                        "requestId": "1",
+                    }
+                )
+            )
+            received.set_result(
+                (
+                    websocket.subprotocol,
+                    websocket.extensions,
+                    codec.decode(await websocket.recv()),
+                )
+            )
+
+        async def on_request(request):
+            await request.reply(Response(True, [request.item]))
+
+        async with websockets.serve(
+            server_handler, "localhost", 0, subprotocols=["inventory.columnar"]
+        ) as server:
+            port = server.sockets[0].getsockname()[1]
+            client = Client(
+                f"ws://localhost:{port}",
+                Communication(True, 1, [WireFormat.MSGPACK, WireFormat.COLUMNAR]),
+            )
+            client.on_message(on_request)
+            connection = asyncio.ensure_future(client.connect())
+            try:
+                return await asyncio.wait_for(received, 5)
+            finally:
+                connection.cancel()
+
+    subprotocol, extensions, response = asyncio.run(run())
+    assert subprotocol == "inventory.columnar", "Wrong format negotiated"
+    assert len(extensions) == 1, "Compression not negotiated"
+    assert response == {
+        "found": True,
+        "items": [{"type": "bed", "manufacturer": "Bosch", "model": "Med231"}],
+        "requestId": "1",
+    }, "Wrong response"
+
+
+class FakeConnection:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+
+def test_request_reply_numbers_streamed_responses():
+    connection = FakeConnection()
+    request = Request(connection, Item("bed", "Bosch", "Med231"), "1", chunk_size=1)
+    items = [Item("bed", "Bosch", "Med231"), Item("bed", "Bosch", "Med 231")]
+
+    async def run():
+        await request.reply(Response(True, items[:1]), end=False)
+        await request.reply(Response(True, items[1:]))
+
+    asyncio.run(run())
+    assert [(m["seq"], m["end"]) for m in connection.sent] == [(0, False), (1, True)]
+    assert all(m["requestId"] == "1" for m in connection.sent), "Missing request id"
+
+
+def test_request_reply_not_numbered_without_streaming():
+    connection = FakeConnection()
+    request = Request(connection, Item("bed", "Bosch", "Med231"))
+
+    asyncio.run(request.reply(Response(False, [])))
+    assert connection.sent == [{"found": False, "items": []}], "Wrong response"
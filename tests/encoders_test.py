@@ -0,0 +1,97 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.encoders import (
+    EncoderException,
+    OnnxEncoder,
+    SentenceEncoder,
+    check_parity,
+    pool_and_project,
+)
+import subprocess
+import sys
+
+
+class FakeEncoder(SentenceEncoder):
+    def __init__(self, embeddings):
+        self._embeddings = embeddings
+
+    def encode(self, sentences):
+        return self._embeddings
+
+    def count_tokens(self, sentences):
+        return [len(s.split()) for s in sentences]
+
+
+class FakeTokenizer:
+    def __call__(self, sentences, **kwargs):
+        lengths = [len(s.split()) for s in sentences]
+        mask = np.array(
+            [[1] * n + [0] * (max(lengths) - n) for n in lengths], dtype=np.int64
+        )
+        return {"input_ids": mask, "attention_mask": mask}
+
+
+class FakeSession:
+    def run(self, outputs, inputs):
+        # The token embeddings of token i are [i, 1]
+        batch, length = inputs["input_ids"].shape
+        positions = np.tile(np.arange(length, dtype=np.float32), (batch, 1))
+        return [np.stack([positions, np.ones_like(positions)], axis=-1)]
+
+
+def make_onnx_encoder():
+    encoder = OnnxEncoder.__new__(OnnxEncoder)
+    encoder._session = FakeSession()
+    encoder._input_names = ["input_ids", "attention_mask"]
+    encoder._tokenizer = FakeTokenizer()
+    encoder._dense_weight = np.eye(2, dtype=np.float32)
+    encoder._dense_bias = np.zeros(2, dtype=np.float32)
+    encoder._max_seq_length = 128
+    return encoder
+
+
+def test_encoders_do_not_import_torch():
+    code = "import sys, src.encoders; assert 'torch' not in sys.modules; assert 'sentence_transformers' not in sys.modules"
+
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_check_parity_passes():
+    expected = np.array([[1.0, 0.0], [0.0, 1.0]])
+    candidate = FakeEncoder(np.array([[2.0, 0.0], [0.1, 1.0]]))
+
+    similarity = check_parity(expected, candidate, ["a", "b"], 0.98)
+
+    assert similarity == pytest.approx(1 / np.sqrt(1.01)), "Wrong similarity"
+
+
+def test_check_parity_fails():
+    expected = np.array([[1.0, 0.0], [0.0, 1.0]])
+    candidate = FakeEncoder(np.array([[1.0, 0.0], [1.0, 1.0]]))
+
+    with pytest.raises(EncoderException):
+        check_parity(expected, candidate, ["a", "b"], 0.98)
+
+
+def test_pool_and_project_ignores_padding():
+    token_embeddings = np.array([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]]])
+    attention_mask = np.array([[1, 1, 0]])
+    weight = np.array([[1.0, 0.0], [1.0, -1.0]])
+    bias = np.array([0.0, 0.5])
+
+    embeddings = pool_and_project(token_embeddings, attention_mask, weight, bias)
+
+    # Mean of the unpadded tokens: [2, 3]
+    np.testing.assert_allclose(embeddings, np.tanh([[2.0, -0.5]]))
+
+
+def test_onnx_encoder_encodes_batches_and_sentences():
+    encoder = make_onnx_encoder()
+
+    embeddings = encoder.encode(["a b c", "a"])
+
+    # Mean positions: 1 for 3 tokens, 0 for 1 token
+    np.testing.assert_allclose(embeddings, np.tanh([[1.0, 1.0], [0.0, 1.0]]))
+    np.testing.assert_allclose(encoder.encode("a b c"), np.tanh([1.0, 1.0]))
@@ -0,0 +1,82 @@
+import pytest
+
+pytest.importorskip("websockets")
+
+from load_test import LoadGenerator, percentile
+from types import SimpleNamespace
+
+
+class FakeWebSocket:
+    subprotocol = None
+    extensions = []
+
+
+def make_generator(**args):
+    args = {"formats": "", "seed": 0, "rate": None, "concurrency": 4, **args}
+    return LoadGenerator(FakeWebSocket(), [{}], [1], SimpleNamespace(**args))
+
+
+def test_percentile():
+    values = list(range(100, 0, -1))
+
+    assert percentile([], 50) is None, "Wrong empty percentile"
+    assert percentile([7], 0) == 7, "Wrong single value percentile"
+    assert percentile([7], 99) == 7, "Wrong single value percentile"
+    assert percentile(values, 50) == 50, "Wrong p50"
+    assert percentile(values, 99) == 99, "Wrong p99"
+    assert percentile(values, 100) == 100, "Wrong p100"
+    assert percentile(values, 0) == 1, "Wrong p0"
+
+
+def test_percentile_boundaries():
+    values = [1, 2, 3, 4]
+
+    assert percentile(values, 50) == 2, "Wrong p50"
+    assert percentile(values, 51) == 3, "Wrong p51"
+    assert percentile(values, 75) == 3, "Wrong p75"
+    assert percentile(values, 99) == 4, "Wrong p99"
+
+
+def test_report():
+    generator = make_generator()
+    generator.latencies = [i / 1000 for i in range(1, 101)]
+    generator.first_result_latencies = [0.001] * 100
+    generator.found = 90
+    generator.overloaded = 3
+    generator.timeouts = 2
+    generator.bytes_received = 5000
+    generator.messages_received = 100
+
+    report = generator.report(10)
+
+    assert report["mode"] == "concurrency=4", "Wrong mode"
+    assert report["completed"] == 100, "Wrong completed requests"
+    assert report["found"] == 90, "Wrong found requests"
+    assert report["overloaded"] == 3, "Wrong overloaded requests"
+    assert report["timeouts"] == 2, "Wrong timeouts"
+    assert report["format"] == "json", "Wrong format"
+    assert not report["compression"], "Wrong compression"
+    assert report["mean_message_bytes"] == 50, "Wrong message size"
+    assert report["throughput_per_second"] == 10, "Wrong throughput"
+    assert report["latency_ms"]["mean"] == pytest.approx(50.5), "Wrong mean"
+    assert report["latency_ms"]["p50"] == pytest.approx(50), "Wrong p50"
+    assert report["latency_ms"]["p95"] == pytest.approx(95), "Wrong p95"
+    assert report["latency_ms"]["p99"] == pytest.approx(99), "Wrong p99"
+    assert report["latency_ms"]["max"] == pytest.approx(100), "Wrong max"
+    assert report["first_result_latency_ms"]["p99"] == pytest.approx(1), "Wrong p99"
+
+
+def test_report_without_requests():
+    report = make_generator(rate=5.0).report(0)
+
+    assert report["mode"] == "rate=5.0/s", "Wrong mode"
+    assert report["completed"] == 0, "Wrong completed requests"
+    assert report["mean_message_bytes"] is None, "Wrong message size"
+    assert report["throughput_per_second"] == 0, "Wrong throughput"
+    assert report["latency_ms"] == {
+        "mean": None,
+        "p50": None,
+        "p95": None,
+        "p99": None,
+        "max": None,
+    }, "Wrong latencies"
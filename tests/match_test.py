@@ -0,0 +1,117 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("spacy")
+pytest.importorskip("scipy")
+
+from src.match import (
+    EncodedCandidates,
+    EncodedCandidatesBuilder,
+    Matcher,
+    RankedMatches,
+)
+from src.models import Item
+
+# The embedding of each model, as encoded by the fake matcher
+EMBEDDINGS = {
+    "Med231": [1.0, 0.0],
+    "Med232": [0.9, 0.1],
+    "Hospi": [0.0, 1.0],
+}
+
+
+class FakeMatcher(Matcher):
+    def __init__(self):
+        self.lemmatize = False
+        self.encoded = []
+
+    def encode_sentences(self, sentences):
+        self.encoded.append(list(sentences))
+        return np.array([self._compute_embedding(s) for s in sentences])
+
+    def _compute_embedding(self, sentence):
+        return np.array(EMBEDDINGS[sentence.split()[-1]])
+
+
+def make_items(models):
+    return [Item("bed", "Bosch", model, id=str(i)) for i, model in enumerate(models)]
+
+
+def make_candidates(count):
+    items = [Item("bed", "Bosch", f"Med{i}", id=str(i)) for i in range(count)]
+    return EncodedCandidates(items, [[i] for i in range(count)], None)
+
+
+def ids(items):
+    return [item.id for item in items]
+
+
+def test_ranked_matches_sorts_best_first():
+    candidates = make_candidates(6)
+    ranked = RankedMatches(candidates, [0.7, 0.9, 0.2, 0.8, 0.65, 0.95], 0.6, 2)
+
+    assert ids(ranked.head()) == ["5", "1"], "Wrong best matches"
+    assert ranked.has_tail(), "Missing remaining matches"
+    assert ids(ranked.tail()) == ["3", "0", "4"], "Wrong remaining matches"
+
+
+def test_ranked_matches_without_tail():
+    candidates = make_candidates(3)
+    ranked = RankedMatches(candidates, [0.7, 0.1, 0.9], 0.6, 5)
+
+    assert ids(ranked.head()) == ["2", "0"], "Wrong best matches"
+    assert not ranked.has_tail(), "Unexpected remaining matches"
+    assert ranked.tail() == [], "Unexpected remaining matches"
+
+
+def test_ranked_matches_empty():
+    ranked = RankedMatches(make_candidates(2), [0.1, 0.2], 0.6, 5)
+
+    assert not ranked, "Unexpected matches"
+
+
+def test_ranked_matches_expands_groups():
+    items = [Item("bed", "Bosch", "Med231", id=str(i)) for i in range(3)]
+    candidates = EncodedCandidates(items, [[0, 2], [1]], None)
+    ranked = RankedMatches(candidates, [0.8, 0.9], 0.6, 1)
+
+    assert ids(ranked.head() + ranked.tail()) == ["1", "0", "2"], "Wrong matches"
+
+
+def test_builder_encodes_each_sentence_once():
+    matcher = FakeMatcher()
+    items = make_items(["Med231", "Hospi", "Med231", "Med232", "Hospi", "Med231"])
+    builder = EncodedCandidatesBuilder(matcher)
+
+    builder.add(items[:3])
+    builder.add(items[3:])
+    candidates = builder.build()
+
+    assert matcher.encoded == [
+        ["bed Bosch Med231", "bed Bosch Hospi"],
+        ["bed Bosch Med232"],
+    ], "Sentences encoded several times"
+    assert ids(candidates.items) == ["0", "1", "2", "3", "4", "5"], "Wrong items"
+    assert candidates.groups == [[0, 2, 5], [1, 4], [3]], "Wrong groups"
+    assert len(candidates.embeddings) == 3, "Wrong embeddings"
+
+
+def test_builder_skips_chunks_without_new_sentences():
+    matcher = FakeMatcher()
+    builder = EncodedCandidatesBuilder(matcher)
+
+    builder.add(make_items(["Med231"]))
+    builder.add(make_items(["Med231", "Med231"]))
+
+    assert matcher.encoded == [["bed Bosch Med231"]], "Known sentences encoded"
+    assert builder.build().groups == [[0, 1, 2]], "Wrong groups"
+
+
+def test_find_matches_fans_out_to_grouped_items():
+    matcher = FakeMatcher()
+    items = make_items(["Med232", "Hospi", "Med231", "Med232", "Med231"])
+    candidates = matcher.encode_candidates(items)
+
+    matches = matcher.find_matches(Item("bed", "Bosch", "Med231"), candidates)
+
+    assert ids(matches) == ["2", "4", "0", "3"], "Wrong matches"
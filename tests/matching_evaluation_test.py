@@ -0,0 +1,62 @@
+import pytest
+
+pytest.importorskip("spacy")
+pytest.importorskip("scipy")
+
+from benchmarks.matching_evaluation import distribution, evaluate, precision_recall_at_k
+from src.match import EncodedCandidates
+from src.models import Item
+
+
+class FakeMatcher:
+    def __init__(self, similarities):
+        self._similarities = similarities
+
+    def encode_candidates(self, candidates):
+        return EncodedCandidates(
+            candidates, [[i] for i in range(len(candidates))], None
+        )
+
+    def similarities(self, query, candidates):
+        return self._similarities[query.model]
+
+
+def test_precision_recall_at_k():
+    ranked = ["1", "2", "3", "4"]
+
+    assert precision_recall_at_k(ranked, {"1", "3"}, 1) == (1, 0.5)
+    assert precision_recall_at_k(ranked, {"1", "3"}, 2) == (0.5, 0.5)
+    assert precision_recall_at_k(ranked, {"1", "3"}, 4) == (0.5, 1)
+
+
+def test_distribution():
+    values = distribution([0.1, 0.2, 0.3])
+
+    assert values["min"] == pytest.approx(0.1), "Wrong minimum"
+    assert values["p50"] == pytest.approx(0.2), "Wrong median"
+    assert values["max"] == pytest.approx(0.3), "Wrong maximum"
+    assert distribution([]) == {}, "Wrong empty distribution"
+
+
+def test_evaluate():
+    inventory = [
+        Item("bed", "Bosch", "Med231", id="1"),
+        Item("bed", "Invacare", "Medley", id="2"),
+    ]
+    queries = [
+        (Item("bed", "Bosch", "Med231"), {"1"}),
+        (Item("bed", "Invacare", "Medley"), {"2"}),
+    ]
+    matcher = FakeMatcher({"Med231": [0.9, 0.5], "Medley": [0.7, 0.65]})
+
+    results = evaluate(matcher, inventory, queries, [0.6])
+
+    assert results["precision_at_k"][1] == 0.5, "Wrong precision@1"
+    assert results["recall_at_k"][5] == 1, "Wrong recall@5"
+    assert results["thresholds"][0.6] == {
+        "precision": 2 / 3,
+        "recall": 1,
+        "matches_per_query": 1.5,
+    }, "Wrong threshold metrics"
+    assert results["similarities"]["relevant"]["max"] == pytest.approx(0.9)
+    assert results["latency_ms"], "Latency not measured"
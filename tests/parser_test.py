@@ -1,12 +1,23 @@
 from src.models import (
+    Admission,
     ApiConfig,
+    Batching,
+    Communication,
     Condition,
     ConnectionType,
     DbConfig,
+    Encoder,
+    EncoderBackend,
     Endpoint,
     Fields,
     HttpMethod,
     Language,
+    MultiConfig,
+    Profiling,
+    ProfilingMode,
+    Refresh,
+    Source,
+    WireFormat,
 )
 from src.parser import ConfigParser, ParserException
 import pytest
@@ -170,3 +181,231 @@ def test_parser_endpoint_path_param_in_url_not_found():
 def test_parser_endpoint_path_param_not_found_in_url():
     with pytest.raises(ParserException):
         ConfigParser(f"{CONFIGS_PATH}/no_path_param_found_in_url.json")
+
+
+def test_parser_parses_refresh():
+    parser = ConfigParser(f"{CONFIGS_PATH}/refresh_config.json")
+    config: DbConfig = cast(DbConfig, parser.parse())
+
+    assert config.refresh == Refresh(30), "Wrong refresh"
+
+
+def test_parser_refresh_defaults_when_missing():
+    parser = ConfigParser(f"{CONFIGS_PATH}/db_config.json")
+    config: DbConfig = cast(DbConfig, parser.parse())
+
+    assert config.refresh == Refresh(), "Wrong default refresh"
+
+
+def test_parser_refresh_interval_not_found():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/no_refresh_interval.json")
+
+
+def test_parser_refresh_interval_invalid():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/invalid_refresh_interval.json")
+
+
+def test_parser_parses_encoder():
+    parser = ConfigParser(f"{CONFIGS_PATH}/encoder_config.json")
+    config: ApiConfig = cast(ApiConfig, parser.parse())
+
+    assert config.encoder == Encoder(
+        EncoderBackend.ONNX, "models/distiluse-onnx", False, 4, False
+    ), "Wrong encoder"
+
+
+def test_parser_encoder_defaults_when_missing():
+    parser = ConfigParser(f"{CONFIGS_PATH}/api_config.json")
+    config: ApiConfig = cast(ApiConfig, parser.parse())
+
+    assert config.encoder == Encoder(), "Wrong default encoder"
+
+
+def test_parser_encoder_path_not_found():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/no_encoder_path.json")
+
+
+def test_parser_encoder_backend_invalid():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/invalid_encoder_backend.json")
+
+
+def test_parser_encoder_threads_invalid():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/invalid_encoder_threads.json")
+
+
+def test_parser_parses_batching():
+    parser = ConfigParser(f"{CONFIGS_PATH}/batching_config.json")
+    config: DbConfig = cast(DbConfig, parser.parse())
+
+    assert config.batching == Batching(64, 256), "Wrong batching"
+
+
+def test_parser_batching_defaults_when_missing():
+    parser = ConfigParser(f"{CONFIGS_PATH}/db_config.json")
+    config: DbConfig = cast(DbConfig, parser.parse())
+
+    assert config.batching == Batching(), "Wrong default batching"
+
+
+def test_parser_batching_batch_size_invalid():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/invalid_batching_batch_size.json")
+
+
+def test_parser_batching_memory_cap_invalid():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/invalid_batching_memory_cap.json")
+
+
+def test_parser_parses_multi_config():
+    parser = ConfigParser(f"{CONFIGS_PATH}/multi_config.json")
+    config: MultiConfig = cast(MultiConfig, parser.parse())
+
+    assert config.id == 12345, "Wrong id"
+    assert config.type == ConnectionType.MULTI, "Wrong connection type"
+    assert config.token == "abcdf", "Wrong token"
+    assert config.language == Language.FR, "Wrong language"
+    assert config.sources == [
+        Source(
+            DbConfig(
+                12345,
+                ConnectionType.DB,
+                "a db url",
+                "abcdf",
+                Language.FR,
+                Fields(
+                    "eid",
+                    "category",
+                    "manufacturer",
+                    "model",
+                    Condition("status", ["available", "disponible"]),
+                ),
+                "items",
+            ),
+            5,
+        ),
+        Source(
+            ApiConfig(
+                12345,
+                ConnectionType.API,
+                "an api url",
+                "abcdf",
+                Language.FR,
+                Fields("id", "type", "brand", "model", Condition("state", ["free"])),
+                Endpoint("the auth token", "items", HttpMethod.GET, {}, {}),
+            )
+        ),
+    ], "Wrong sources"
+
+
+def test_parser_sources_not_found():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/no_sources.json")
+
+
+def test_parser_sources_empty():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/empty_sources.json")
+
+
+def test_parser_source_url_not_found():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/no_source_url.json")
+
+
+def test_parser_source_timeout_invalid():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/invalid_source_timeout.json")
+
+
+def test_parser_parses_admission():
+    parser = ConfigParser(f"{CONFIGS_PATH}/admission_config.json")
+    config: DbConfig = cast(DbConfig, parser.parse())
+
+    assert config.admission == Admission(16, 2, 5), "Wrong admission"
+
+
+def test_parser_admission_defaults_when_missing():
+    parser = ConfigParser(f"{CONFIGS_PATH}/db_config.json")
+    config: DbConfig = cast(DbConfig, parser.parse())
+
+    assert config.admission == Admission(), "Wrong default admission"
+
+
+def test_parser_admission_queue_size_invalid():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/invalid_admission_queue_size.json")
+
+
+def test_parser_admission_deadline_invalid():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/invalid_admission_deadline.json")
+
+
+def test_parser_parses_profiling():
+    parser = ConfigParser(f"{CONFIGS_PATH}/profiling_config.json")
+    config: DbConfig = cast(DbConfig, parser.parse())
+
+    assert config.profiling == Profiling(
+        0.01, 250, ProfilingMode.CPROFILE, 5, True, "/var/log/connector/profiles", 20
+    ), "Wrong profiling"
+    assert config.profiling.enabled, "Profiling not enabled"
+
+
+def test_parser_profiling_disabled_when_missing():
+    parser = ConfigParser(f"{CONFIGS_PATH}/db_config.json")
+    config: DbConfig = cast(DbConfig, parser.parse())
+
+    assert config.profiling == Profiling(), "Wrong default profiling"
+    assert not config.profiling.enabled, "Profiling enabled by default"
+
+
+def test_parser_profiling_trigger_not_found():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/no_profiling_trigger.json")
+
+
+def test_parser_profiling_sample_rate_invalid():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/invalid_profiling_sample_rate.json")
+
+
+def test_parser_profiling_mode_invalid():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/invalid_profiling_mode.json")
+
+
+def test_parser_parses_communication():
+    parser = ConfigParser(f"{CONFIGS_PATH}/communication_config.json")
+    config: DbConfig = cast(DbConfig, parser.parse())
+
+    assert config.communication == Communication(
+        True, 6, [WireFormat.MSGPACK, WireFormat.COLUMNAR, WireFormat.JSON], 100
+    ), "Wrong communication"
+
+
+def test_parser_communication_defaults_when_missing():
+    parser = ConfigParser(f"{CONFIGS_PATH}/db_config.json")
+    config: DbConfig = cast(DbConfig, parser.parse())
+
+    assert config.communication == Communication(), "Wrong default communication"
+
+
+def test_parser_communication_format_invalid():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/invalid_communication_format.json")
+
+
+def test_parser_communication_compression_level_invalid():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/invalid_communication_compression_level.json")
+
+
+def test_parser_communication_chunk_size_invalid():
+    with pytest.raises(ParserException):
+        ConfigParser(f"{CONFIGS_PATH}/invalid_communication_chunk_size.json")
@@ -0,0 +1,138 @@
+import pytest
+
+pytest.importorskip("websockets")
+
+from src.communication import Request
+from src.models import Item, Profiling, ProfilingMode
+from src.profiling import RequestProfiler, profiled
+import asyncio
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+
+def make_request(id):
+    return Request(None, Item("bed", "Bosch", "Med231"), id)
+
+
+async def slow_handler(request):
+    request.timings["matching"] = 0.02
+    # Blocks the event loop, as matching would without an executor
+    time.sleep(0.02)
+
+
+def profile_files(directory, extension):
+    return sorted(f for f in os.listdir(directory) if f.endswith(extension))
+
+
+def test_profiler_writes_sampled_requests(tmp_path):
+    profiler = RequestProfiler(Profiling(1, interval_ms=1, directory=str(tmp_path)))
+
+    asyncio.run(profiler.wrap(slow_handler)(make_request("1")))
+
+    [metadata_filename] = profile_files(tmp_path, ".json")
+    with open(tmp_path / metadata_filename) as metadata_file:
+        metadata = json.load(metadata_file)
+    assert metadata["request_id"] == "1", "Wrong request id"
+    assert metadata["reason"] == "sampled", "Wrong reason"
+    assert metadata["timings_ms"] == {"matching": 20}, "Wrong timings"
+    assert metadata["duration_ms"] >= 20, "Wrong duration"
+
+    [folded_filename] = profile_files(tmp_path, ".folded")
+    with open(tmp_path / folded_filename) as folded_file:
+        assert "slow_handler" in folded_file.read(), "Handler not sampled"
+
+
+def test_profiler_writes_slow_requests_only(tmp_path):
+    profiler = RequestProfiler(
+        Profiling(threshold_ms=10, mode=ProfilingMode.CPROFILE, directory=str(tmp_path))
+    )
+
+    async def fast_handler(request):
+        pass
+
+    async def run():
+        await profiler.wrap(fast_handler)(make_request("fast"))
+        await profiler.wrap(slow_handler)(make_request("slow"))
+
+    asyncio.run(run())
+
+    [metadata_filename] = profile_files(tmp_path, ".json")
+    with open(tmp_path / metadata_filename) as metadata_file:
+        metadata = json.load(metadata_file)
+    assert metadata["request_id"] == "slow", "Wrong request profiled"
+    assert metadata["reason"] == "slow", "Wrong reason"
+    assert len(profile_files(tmp_path, ".prof")) == 1, "Profile not written"
+
+
+def test_profiler_keeps_latest_profiles(tmp_path):
+    profiler = RequestProfiler(Profiling(1, directory=str(tmp_path), max_files=2))
+
+    async def handler(request):
+        pass
+
+    async def run():
+        for i in range(4):
+            await profiler.wrap(handler)(make_request(str(i)))
+
+    asyncio.run(run())
+
+    assert len(profile_files(tmp_path, ".json")) == 2, "Profiles not rotated"
+    assert len(profile_files(tmp_path, ".folded")) == 2, "Profiles not rotated"
+
+
+def match_in_executor():
+    time.sleep(0.02)
+    return sum(range(1000))
+
+
+def test_profiler_cprofile_covers_executor(tmp_path):
+    profiler = RequestProfiler(
+        Profiling(1, mode=ProfilingMode.CPROFILE, directory=str(tmp_path))
+    )
+
+    async def handler(request):
+        await asyncio.get_running_loop().run_in_executor(
+            None, profiled(match_in_executor)
+        )
+
+    asyncio.run(profiler.wrap(handler)(make_request("1")))
+
+    [profile_filename] = profile_files(tmp_path, ".prof")
+    stats = pstats.Stats(str(tmp_path / profile_filename))
+    functions = [function for _, _, function in stats.stats.keys()]
+    assert "match_in_executor" in functions, "Executor not profiled"
+
+
+def test_profiled_without_profile():
+    assert profiled(match_in_executor) is match_in_executor, "Function wrapped"
+
+
+def test_profiler_traces_allocations_of_sampled_requests_only(tmp_path):
+    tracing = []
+
+    async def handler(request):
+        tracing.append(tracemalloc.is_tracing())
+        request.data = [bytearray(1024) for _ in range(100)]
+
+    async def run(sample_rate):
+        profiler = RequestProfiler(
+            Profiling(
+                sample_rate,
+                threshold_ms=1000,
+                tracemalloc=True,
+                directory=str(tmp_path),
+            )
+        )
+        await profiler.wrap(handler)(make_request(str(sample_rate)))
+
+    asyncio.run(run(0))
+    asyncio.run(run(1))
+
+    assert tracing == [False, True], "Allocations traced for unsampled requests"
+    assert not tracemalloc.is_tracing(), "Allocations still traced"
+    [metadata_filename] = profile_files(tmp_path, ".json")
+    with open(tmp_path / metadata_filename) as metadata_file:
+        assert json.load(metadata_file)["tracemalloc"], "Allocations not written"
@@ -0,0 +1,130 @@
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("databases")
+
+from src import query
+from src.models import Item, MultiConfig
+from src.parser import ConfigParser
+from src.query import FederatedQuerier, Querier
+from typing import cast
+import asyncio
+import time
+
+CONFIGS_PATH = "tests/configs"
+
+
+class FakeQuerier(Querier):
+    def __init__(self, models, delay=0.0):
+        super().__init__(None)
+        self.models = models
+        self.delay = delay
+        self.fail = False
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    async def query(self):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("Source unavailable")
+        return [Item("bed", "Bosch", model, id="5") for model in self.models]
+
+
+def make_querier(monkeypatch, *queriers, timeout=1.0):
+    config = cast(
+        MultiConfig, ConfigParser(f"{CONFIGS_PATH}/multi_config.json").parse()
+    )
+    for source in config.sources:
+        source.timeout = timeout
+    fakes = list(queriers)
+    monkeypatch.setattr(query, "build_querier", lambda config: fakes.pop(0))
+    return FederatedQuerier(config)
+
+
+def models(items):
+    return [item.model for item in items]
+
+
+def test_federated_querier_queries_sources_concurrently(monkeypatch):
+    querier = make_querier(
+        monkeypatch,
+        FakeQuerier(["Med231"], delay=0.1),
+        FakeQuerier(["Med232"], delay=0.1),
+    )
+
+    start = time.perf_counter()
+    items = asyncio.run(querier.query())
+
+    assert time.perf_counter() - start < 0.18, "Sources queried one after the other"
+    assert models(items) == ["Med231", "Med232"], "Wrong items"
+
+
+def test_federated_querier_tags_items_with_their_source(monkeypatch):
+    querier = make_querier(
+        monkeypatch, FakeQuerier(["Med231"]), FakeQuerier(["Med232"])
+    )
+
+    items = asyncio.run(querier.query())
+
+    assert [item.serialize() for item in items] == [
+        {
+            "type": "bed",
+            "manufacturer": "Bosch",
+            "model": "Med231",
+            "id": "5",
+            "source": "0",
+        },
+        {
+            "type": "bed",
+            "manufacturer": "Bosch",
+            "model": "Med232",
+            "id": "5",
+            "source": "1",
+        },
+    ], "Items not tagged with their source"
+
+
+def test_federated_querier_gives_up_on_slow_sources(monkeypatch):
+    slow = FakeQuerier(["Med232"])
+    querier = make_querier(monkeypatch, FakeQuerier(["Med231"]), slow, timeout=0.05)
+
+    async def run():
+        first = await querier.query()
+        slow.models = ["Hospi"]
+        slow.delay = 1
+        start = time.perf_counter()
+        second = await querier.query()
+        return first, second, time.perf_counter() - start
+
+    first, second, duration = asyncio.run(run())
+
+    assert duration < 0.5, "Slow source not given up on"
+    assert models(first) == ["Med231", "Med232"], "Wrong items"
+    assert models(second) == ["Med231", "Med232"], "Last items not reused"
+
+
+def test_federated_querier_reuses_items_of_failed_sources(monkeypatch):
+    failing = FakeQuerier(["Med232"])
+    querier = make_querier(monkeypatch, FakeQuerier(["Med231"]), failing)
+
+    async def run():
+        first = await querier.query()
+        failing.fail = True
+        return first, await querier.query()
+
+    first, second = asyncio.run(run())
+
+    assert models(first) == ["Med231", "Med232"], "Wrong items"
+    assert models(second) == ["Med231", "Med232"], "Last items not reused"
+
+
+def test_federated_querier_without_previous_items(monkeypatch):
+    failing = FakeQuerier(["Med232"])
+    failing.fail = True
+    querier = make_querier(monkeypatch, FakeQuerier(["Med231"]), failing)
+
+    assert models(asyncio.run(querier.query())) == ["Med231"], "Wrong items"
@@ -0,0 +1,100 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("spacy")
+pytest.importorskip("scipy")
+pytest.importorskip("aiohttp")
+pytest.importorskip("databases")
+
+from src.metrics import metrics
+from src.models import Item
+from src.query import Querier
+from src.refresh import InventoryRefresher
+import asyncio
+
+
+class FakeQuerier(Querier):
+    def __init__(self):
+        super().__init__(None)
+        self.queries = 0
+        self.fail = False
+
+    async def connect(self):
+        pass
+
+    async def disconnect(self):
+        pass
+
+    async def query(self):
+        self.queries += 1
+        if self.fail:
+            raise RuntimeError("Inventory unavailable")
+        return [Item("bed", "Bosch", f"Med{self.queries}", id=str(self.queries))]
+
+
+class FakeMatcher:
+    def encode_sentences(self, sentences):
+        return np.ones((len(sentences), 2))
+
+
+async def run_refresher(querier, scenario, start=True):
+    # Built in the running loop, as its events are bound to a loop on Python 3.9 and earlier
+    refresher = InventoryRefresher(querier, FakeMatcher(), 60)
+    task = asyncio.ensure_future(refresher.run()) if start else None
+    try:
+        return await scenario(refresher)
+    finally:
+        if task:
+            task.cancel()
+
+
+def test_refresher_waits_for_first_snapshot():
+    async def scenario(refresher):
+        waiting = asyncio.ensure_future(refresher.snapshot())
+        await asyncio.sleep(0.01)
+        assert not waiting.done(), "Snapshot returned before the first refresh"
+        assert refresher.snapshot_age() is None, "Unexpected snapshot"
+        task = asyncio.ensure_future(refresher.run())
+        try:
+            return await waiting
+        finally:
+            task.cancel()
+
+    snapshot = asyncio.run(run_refresher(FakeQuerier(), scenario, start=False))
+    assert [item.model for item in snapshot.candidates.items] == ["Med1"], "Wrong items"
+
+
+def test_refresher_refreshes_on_request():
+    querier = FakeQuerier()
+
+    async def scenario(refresher):
+        first = await refresher.snapshot()
+        refresher.request_refresh()
+        await asyncio.sleep(0.01)
+        return first, await refresher.snapshot()
+
+    first, second = asyncio.run(run_refresher(querier, scenario))
+
+    assert querier.queries == 2, "Refresh not triggered"
+    assert second is not first, "Snapshot not replaced"
+    assert [item.model for item in second.candidates.items] == ["Med2"], "Wrong items"
+
+
+def test_refresher_keeps_snapshot_on_failure():
+    querier = FakeQuerier()
+    failures = metrics.serialize().get("refresh_failures", 0)
+
+    async def scenario(refresher):
+        first = await refresher.snapshot()
+        querier.fail = True
+        refresher.request_refresh()
+        await asyncio.sleep(0.01)
+        return first, await refresher.snapshot()
+
+    first, second = asyncio.run(run_refresher(querier, scenario))
+
+    assert querier.queries == 2, "Refresh not triggered"
+    assert second is first, "Previous snapshot not kept"
+    assert (
+        metrics.serialize()["refresh_failures"] == failures + 1
+    ), "Failure not counted"
@@ -0,0 +1,77 @@
+import json
+import pytest
+
+from src.models import WireFormat
+from src.serialization import (
+    ColumnarCodec,
+    JsonCodec,
+    build_codecs,
+    from_columns,
+    select_codec,
+    to_columns,
+)
+
+RESPONSE = {
+    "found": True,
+    "items": [
+        {
+            "type": "Lit médicalisé",
+            "manufacturer": "Bosch",
+            "model": "Med231",
+            "id": "1",
+        },
+        {"type": "Lit", "manufacturer": "Bosch", "model": "Med 231"},
+    ],
+    "requestId": "42",
+}
+
+
+def test_json_codec_round_trip():
+    codec = JsonCodec()
+
+    encoded = codec.encode(RESPONSE)
+
+    # Same as the replies sent before formats could be negotiated
+    assert encoded == json.dumps(RESPONSE, ensure_ascii=False).encode()
+    assert codec.decode(encoded) == RESPONSE, "Wrong decoding"
+    assert codec.decode(encoded.decode()) == RESPONSE, "Wrong text decoding"
+
+
+def test_columnar_codec_round_trip():
+    codec = ColumnarCodec()
+
+    encoded = codec.encode(RESPONSE)
+
+    assert JsonCodec().decode(encoded)["items"] == {
+        "type": ["Lit médicalisé", "Lit"],
+        "manufacturer": ["Bosch", "Bosch"],
+        "model": ["Med231", "Med 231"],
+        "id": ["1", None],
+    }, "Items not sent as columns"
+    assert codec.decode(encoded) == RESPONSE, "Wrong decoding"
+
+
+def test_columnar_codec_decodes_requests():
+    request = {"type": "Lit", "manufacturer": "Bosch", "model": "Med231"}
+
+    assert ColumnarCodec().decode(JsonCodec().encode(request)) == request
+
+
+def test_columns_of_no_items():
+    assert to_columns([]) == {}, "Wrong columns"
+    assert from_columns({}) == [], "Wrong items"
+
+
+def test_msgpack_codec_round_trip():
+    pytest.importorskip("msgpack")
+    [codec] = build_codecs([WireFormat.MSGPACK])
+
+    assert codec.decode(codec.encode(RESPONSE)) == RESPONSE, "Wrong decoding"
+
+
+def test_select_codec():
+    codecs = build_codecs([WireFormat.COLUMNAR, WireFormat.JSON])
+
+    assert select_codec(codecs, "inventory.columnar").format == WireFormat.COLUMNAR
+    assert select_codec(codecs, "inventory.json").format == WireFormat.JSON
+    assert select_codec(codecs, None).format == WireFormat.JSON, "No fallback to JSON"
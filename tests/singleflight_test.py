@@ -0,0 +1,91 @@
+from src.metrics import metrics
+from src.singleflight import SingleFlight
+import asyncio
+import pytest
+
+
+def test_singleflight_coalesces_concurrent_calls():
+    flight = SingleFlight("test_concurrent")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def run():
+        return await asyncio.gather(*[flight.do("key", compute) for _ in range(5)])
+
+    assert asyncio.run(run()) == [42] * 5, "Wrong results"
+    assert len(calls) == 1, "Computation not shared"
+    assert (
+        metrics.serialize()["test_concurrent_coalesced"] == 4
+    ), "Wrong coalesced count"
+    assert len(flight) == 0, "Computation still in flight"
+
+
+def test_singleflight_does_not_coalesce_different_keys():
+    flight = SingleFlight("test_keys")
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def run():
+        return await asyncio.gather(
+            flight.do("a", lambda: compute("a")), flight.do("b", lambda: compute("b"))
+        )
+
+    assert asyncio.run(run()) == ["a", "b"], "Wrong results"
+    assert sorted(calls) == ["a", "b"], "Computations shared"
+
+
+def test_singleflight_does_not_coalesce_sequential_calls():
+    flight = SingleFlight("test_sequential")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return len(calls)
+
+    async def run():
+        return [await flight.do("key", compute), await flight.do("key", compute)]
+
+    assert asyncio.run(run()) == [1, 2], "Wrong results"
+
+
+def test_singleflight_shares_exceptions():
+    flight = SingleFlight("test_exceptions")
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    async def run():
+        return await asyncio.gather(
+            *[flight.do("key", compute) for _ in range(3)], return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results), "Exception not shared"
+
+
+def test_singleflight_survives_cancelled_caller():
+    flight = SingleFlight("test_cancelled")
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def run():
+        first = asyncio.ensure_future(flight.do("key", compute))
+        second = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == 42, "Computation cancelled"
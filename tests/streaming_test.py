@@ -0,0 +1,88 @@
+from src.streaming import JsonArrayParser
+import json
+import pytest
+
+ITEMS = [
+    {
+        "eid": 1,
+        "category": "Lit médicalisé",
+        "manufacturer": "Bosch",
+        "model": "Med231",
+    },
+    {
+        "eid": 2,
+        "category": "Pousse-seringue",
+        "manufacturer": "B. Braun",
+        "model": "[x]",
+    },
+    {"eid": 3, "category": "Bed", "manufacturer": "Hill-Rom", "model": '{"a", 1}'},
+]
+
+
+def parse_in_chunks(document: bytes, chunk_size: int):
+    parser = JsonArrayParser()
+    elements = []
+    for i in range(0, len(document), chunk_size):
+        elements.extend(parser.feed(document[i : i + chunk_size]))
+    parser.close()
+    return elements
+
+
+def test_parser_parses_whole_document():
+    document = json.dumps(ITEMS, ensure_ascii=False).encode()
+
+    assert parse_in_chunks(document, len(document)) == ITEMS, "Wrong elements"
+
+
+def test_parser_parses_document_byte_by_byte():
+    document = json.dumps(ITEMS, ensure_ascii=False, indent=2).encode()
+
+    assert parse_in_chunks(document, 1) == ITEMS, "Wrong elements"
+
+
+def test_parser_returns_elements_as_they_arrive():
+    parser = JsonArrayParser()
+
+    assert parser.feed(b'[{"a": 1}, {"b"') == [{"a": 1}], "Wrong first elements"
+    assert parser.feed(b": 2}, 3") == [{"b": 2}], "Wrong second elements"
+    assert parser.feed(b"4]") == [34], "Wrong last elements"
+    parser.close()
+
+
+def test_parser_parses_empty_array():
+    assert parse_in_chunks(b" [ ] ", 1) == [], "Wrong elements"
+
+
+def test_parser_rejects_incomplete_array():
+    with pytest.raises(ValueError):
+        parse_in_chunks(b'[{"a": 1}', 4)
+
+
+def test_parser_rejects_non_array():
+    with pytest.raises(ValueError):
+        parse_in_chunks(b'{"a": 1}', 4)
+
+
+def test_parser_rejects_trailing_data():
+    with pytest.raises(ValueError):
+        parse_in_chunks(b"[1, 2] 3", 4)
+
+
+def test_parser_rejects_missing_separator():
+    with pytest.raises(ValueError):
+        parse_in_chunks(b"[1 2]", 4)
+
+
+def test_parser_rejects_invalid_element_early():
+    parser = JsonArrayParser()
+
+    with pytest.raises(ValueError):
+        parser.feed(b'[{"b": x}, ' + b'{"a": 1}, ' * 1000)
+
+
+def test_parser_waits_for_numbers_cut_by_chunks():
+    numbers = [1.5e3, -2.25, 10, True, None]
+    document = json.dumps(numbers).encode()
+
+    for chunk_size in range(1, len(document) + 1):
+        assert parse_in_chunks(document, chunk_size) == numbers, "Wrong elements"
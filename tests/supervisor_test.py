@@ -0,0 +1,94 @@
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("databases")
+pytest.importorskip("spacy")
+pytest.importorskip("scipy")
+
+from src import supervisor
+from src.supervisor import (
+    Supervisor,
+    parse_smaps_rollup,
+    read_memory,
+    threads_per_worker,
+)
+import os
+
+SMAPS_ROLLUP = """55d0c1a2b000-7ffd8e3f1000 ---p 00000000 00:00 0                          [rollup]
+Rss:              834512 kB
+Pss:              301277 kB
+Pss_Anon:         120044 kB
+Shared_Clean:     520112 kB
+Shared_Dirty:      12040 kB
+Private_Clean:     62104 kB
+Private_Dirty:    240256 kB
+Referenced:       834512 kB
+Anonymous:        252296 kB
+Swap:                  0 kB
+"""
+
+
+def test_parse_smaps_rollup():
+    assert parse_smaps_rollup(SMAPS_ROLLUP) == {
+        "rss": 834512,
+        "pss": 301277,
+        "shared": 532152,
+        "private": 302360,
+    }, "Wrong memory"
+
+
+def test_read_memory():
+    if not os.path.exists(f"/proc/{os.getpid()}/smaps_rollup"):
+        pytest.skip("smaps_rollup unavailable")
+
+    memory = read_memory(os.getpid())
+
+    assert memory is not None, "Memory not read"
+    assert 0 < memory["pss"] <= memory["rss"], "Wrong memory"
+
+
+def test_read_memory_of_missing_process():
+    assert read_memory(-1) is None, "Memory of missing process read"
+
+
+def test_threads_per_worker():
+    assert threads_per_worker(4, 16) == 4, "Wrong threads"
+    assert threads_per_worker(3, 8) == 2, "Wrong threads"
+    assert threads_per_worker(16, 8) == 1, "Wrong threads"
+    assert threads_per_worker(2, None) == 1, "Wrong threads"
+
+
+def test_supervisor_does_not_restart_workers_once_stopping(monkeypatch):
+    sup = Supervisor("ws://localhost", "config.json", 1, 3600)
+    forked = []
+    exited = set()
+    sleeps = []
+
+    def fork():
+        forked.append(1000 + len(forked))
+        return forked[-1]
+
+    def waitpid(pid, options):
+        return (pid, 0) if pid in exited or pid == 1000 else (0, 0)
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        assert len(sleeps) < 10, "Supervisor did not stop"
+        if forked[-1] == 1001:
+            exited.add(1001)
+        if seconds > 1:
+            # Stopped while waiting to restart the crashing worker
+            sup._stop(None, None)
+
+    monkeypatch.setattr(Supervisor, "_load", lambda self: None)
+    monkeypatch.setattr(supervisor.gc, "disable", lambda: None)
+    monkeypatch.setattr(supervisor.gc, "freeze", lambda: None)
+    monkeypatch.setattr(supervisor.signal, "signal", lambda signum, handler: None)
+    monkeypatch.setattr(supervisor.os, "fork", fork)
+    monkeypatch.setattr(supervisor.os, "waitpid", waitpid)
+    monkeypatch.setattr(supervisor.os, "kill", lambda pid, signum: exited.add(pid))
+    monkeypatch.setattr(supervisor.time, "sleep", sleep)
+
+    sup.run()
+
+    assert forked == [1000, 1001], "Worker restarted while stopping"